@@ -8,11 +8,13 @@ Reference: https://developer.apple.com/documentation/applemusicapi
 """
 import logging
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from backend.utils.apple_music import get_apple_music_token
 
@@ -28,6 +30,13 @@ class AppleMusicClient:
 
     BASE_URL = "https://api.music.apple.com/v1"
 
+    # Keep-alive connections to the API host; covers the scheduler's concurrent
+    # catalog lookups, which share one client across worker threads
+    HTTP_POOL_SIZE = 8
+
+    # Playlists fetched at once while scanning
+    PLAYLIST_FETCH_CONCURRENCY = 4
+
     # VERIFIED Apple Music Spatial Audio Playlists (December 2024)
     # These are real, active playlists curated by Apple
     SPATIAL_AUDIO_PLAYLISTS = [
@@ -94,6 +103,14 @@ class AppleMusicClient:
             "Music-User-Token": self.music_user_token
         }
 
+        # One session per client so requests reuse TLS connections instead of
+        # handshaking with the API on every call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.HTTP_POOL_SIZE)
+        )
+
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """
         Make a request to Apple Music API.
@@ -112,7 +129,7 @@ class AppleMusicClient:
         url = f"{self.BASE_URL}/{endpoint}"
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.Timeout:
@@ -143,7 +160,8 @@ class AppleMusicClient:
             include_audio_variants: Whether to include audioVariants in response
             
         Returns:
-            List of track data with spatial audio information
+            List of track data with spatial audio information, or None if the
+            request failed (IDs the catalog doesn't have are simply absent)
         """
         if not ids:
             return []
@@ -161,7 +179,7 @@ class AppleMusicClient:
         if response and "data" in response:
             return response["data"]
 
-        return []
+        return None
 
     def get_playlist_tracks(self, playlist_id: str, storefront: str = "us",
                            limit: int = 100, offset: int = 0) -> Optional[List[Dict]]:
@@ -268,6 +286,20 @@ class AppleMusicClient:
 
         return result
 
+    def _fetch_playlists(self, playlist_ids: List[str], storefront: str) -> Dict[str, Future]:
+        """
+        Fetch several playlists' tracks concurrently.
+
+        Returns completed futures keyed by playlist ID; callers still process them
+        in playlist order, so deduplication doesn't depend on response timing.
+        A failed fetch re-raises from its future's result().
+        """
+        with ThreadPoolExecutor(max_workers=self.PLAYLIST_FETCH_CONCURRENCY) as executor:
+            return {
+                playlist_id: executor.submit(self.get_playlist_tracks, playlist_id, storefront)
+                for playlist_id in playlist_ids
+            }
+
     TARGET_STOREFRONTS = ['us', 'gb', 'jp', 'de']
 
     def discover_spatial_audio_tracks(self, storefront: str = "us",
@@ -294,9 +326,10 @@ class AppleMusicClient:
         # Collection of track IDs to check for regional availability
         discovered_ids = []
 
+        fetched = self._fetch_playlists(playlists_to_scan, storefront)
         for playlist_id in playlists_to_scan:
             try:
-                tracks = self.get_playlist_tracks(playlist_id, storefront)
+                tracks = fetched[playlist_id].result()
 
                 if not tracks:
                     logger.warning(f"No tracks found in playlist {playlist_id}")
@@ -357,7 +390,7 @@ class AppleMusicClient:
             for chunk in chunks:
                 try:
                     # Fetch tracks for this storefront
-                    tracks = self.get_catalog_tracks(storefront, ids=chunk)
+                    tracks = self.get_catalog_tracks(storefront, ids=chunk) or []
 
                     # Create a set of found IDs for this storefront
                     found_tracks = {t.get("id"): t for t in tracks}
@@ -457,9 +490,10 @@ class AppleMusicClient:
             return datetime.now()
 
         try:
-            # Handle YYYY-MM-DD format
+            # Handle YYYY-MM-DD format (fromisoformat is a C fast path; strptime
+            # goes through locale-aware regex matching on every track)
             if len(date_string) == 10:
-                return datetime.strptime(date_string, "%Y-%m-%d")
+                return datetime.fromisoformat(date_string)
             # Handle ISO format with timezone
             return datetime.fromisoformat(date_string.replace("Z", "+00:00"))
         except (ValueError, AttributeError):
@@ -530,9 +564,10 @@ class AppleMusicClient:
         all_playlists = self.NEW_MUSIC_PLAYLISTS + self.CHART_PLAYLISTS
         logger.info(f"Scanning {len(all_playlists)} new music and chart playlists for Atmos tracks")
 
+        fetched = self._fetch_playlists(all_playlists, storefront)
         for playlist_id in all_playlists:
             try:
-                tracks = self.get_playlist_tracks(playlist_id, storefront)
+                tracks = fetched[playlist_id].result()
 
                 if not tracks:
                     logger.debug(f"No tracks found in playlist {playlist_id}")
@@ -731,45 +766,55 @@ class AppleMusicClient:
         Returns:
             Deduplicated list of all discovered spatial audio tracks
         """
-        all_tracks = []
+        logger.info("Starting comprehensive spatial audio discovery...")
+
+        all_tracks = [
+            track
+            for batch in self.iter_spatial_audio_track_batches(storefront)
+            for track in batch
+        ]
+
+        logger.info(f"TOTAL: Discovered {len(all_tracks)} unique spatial audio tracks")
+        return all_tracks
+
+    def iter_spatial_audio_track_batches(self, storefront: str = "us",
+                                         comprehensive: bool = True) -> Iterator[List[Dict]]:
+        """
+        Yield discovered spatial audio tracks one source at a time.
+
+        Lets callers store a source's tracks while the next source is still
+        being fetched. Tracks are deduplicated by apple_music_id across sources.
+
+        Args:
+            storefront: Apple Music storefront (country code)
+            comprehensive: If False, only scan the curated Spatial Audio playlists
+
+        Yields:
+            Lists of tracks not seen in an earlier batch
+        """
+        # Curated Spatial Audio playlists first (most reliable source)
+        sources = [("Curated Spatial Audio playlists", self.discover_spatial_audio_tracks)]
+        if comprehensive:
+            sources += [
+                ("New Music and Chart playlists", self.discover_from_new_music_playlists),
+                ("New album releases", self.discover_new_album_releases),
+                ("Search-based discovery", self.search_recent_atmos_releases),
+            ]
+
         seen_ids = set()
+        for source_number, (label, discover) in enumerate(sources, start=1):
+            logger.info(f"Source {source_number}: {label}")
+            tracks = discover(storefront)
 
-        def add_tracks(tracks: List[Dict]):
-            """Helper to add tracks while deduplicating by apple_music_id."""
+            new_tracks = []
             for track in tracks:
                 track_id = track.get("apple_music_id")
                 if track_id and track_id not in seen_ids:
                     seen_ids.add(track_id)
-                    all_tracks.append(track)
+                    new_tracks.append(track)
 
-        logger.info("Starting comprehensive spatial audio discovery...")
-
-        # 1. Curated Spatial Audio playlists (most reliable source)
-        logger.info("Source 1: Curated Spatial Audio playlists")
-        spatial_playlist_tracks = self.discover_spatial_audio_tracks(storefront)
-        add_tracks(spatial_playlist_tracks)
-        logger.info(f"  -> {len(spatial_playlist_tracks)} tracks from Spatial Audio playlists")
-
-        # 2. New Music and Chart playlists (for recent releases)
-        logger.info("Source 2: New Music and Chart playlists")
-        new_music_tracks = self.discover_from_new_music_playlists(storefront)
-        add_tracks(new_music_tracks)
-        logger.info(f"  -> {len(new_music_tracks)} tracks from New Music playlists")
-
-        # 3. New album releases from charts
-        logger.info("Source 3: New album releases")
-        album_tracks = self.discover_new_album_releases(storefront)
-        add_tracks(album_tracks)
-        logger.info(f"  -> {len(album_tracks)} tracks from new albums")
-
-        # 4. Search-based discovery
-        logger.info("Source 4: Search-based discovery")
-        search_tracks = self.search_recent_atmos_releases(storefront)
-        add_tracks(search_tracks)
-        logger.info(f"  -> {len(search_tracks)} tracks from search")
-
-        logger.info(f"TOTAL: Discovered {len(all_tracks)} unique spatial audio tracks")
-        return all_tracks
+            logger.info(f"  -> {len(tracks)} tracks from {label}")
+            yield new_tracks
 
     def test_connection(self) -> bool:
         """
@@ -782,6 +827,13 @@ class AppleMusicClient:
             logger.error("No developer token configured")
             return False
 
+        # A developer token is a JWT (header.payload.signature); a malformed one
+        # can't authenticate, so skip the round trip
+        parts = self.developer_token.split(".")
+        if len(parts) != 3 or not all(parts):
+            logger.error("Developer token is not a well-formed JWT")
+            return False
+
         # Try to fetch a known playlist
         try:
             endpoint = "catalog/us/playlists/pl.ba2404fbc4464b8ba2d60399189cf24e"
@@ -3,6 +3,7 @@ Database configuration and session management.
 """
 import os
 
+import orjson
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
@@ -16,10 +17,29 @@ DATABASE_URL = os.getenv(
     "sqlite:///./spatial_selecta.db"
 )
 
-# Create SQLAlchemy engine
+# Connection pool sizing for server databases. The API thread pool and the
+# scheduler jobs share one pool; pre-ping and recycling drop connections the
+# server (or a proxy in between) has closed instead of failing a request on them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+
+if "sqlite" in DATABASE_URL:
+    engine_options = {"connect_args": {"check_same_thread": False}}
+else:
+    engine_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+# Create SQLAlchemy engine (JSON columns are encoded/decoded with orjson)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    **engine_options
 )
 
 # Create SessionLocal class
@@ -36,6 +56,15 @@ def init_db():
     run_migrations()
 
 
+# Dropped by run_migrations; each is a prefix of a composite index in backend.models
+SUPERSEDED_INDEXES = (
+    "ix_tracks_format",
+    "ix_track_credits_engineer_id",
+    "ix_community_ratings_track_id",
+    "ix_region_availability_track_id",
+)
+
+
 def run_migrations():
     """
     Run database migrations for schema updates.
@@ -100,6 +129,86 @@ def run_migrations():
             conn.commit()
             print("Migration: Added review_summary column")
 
+    if 'credits_fetched_at' not in existing_columns:
+        with engine.connect() as conn:
+            if 'sqlite' in DATABASE_URL:
+                conn.execute(text('ALTER TABLE tracks ADD COLUMN credits_fetched_at DATETIME'))
+            else:
+                conn.execute(text(
+                    'ALTER TABLE tracks ADD COLUMN IF NOT EXISTS credits_fetched_at TIMESTAMP'
+                ))
+            # Tracks that already have credits don't need another scrape
+            if 'track_credits' in inspector.get_table_names():
+                conn.execute(text(
+                    'UPDATE tracks SET credits_fetched_at = updated_at WHERE EXISTS '
+                    '(SELECT 1 FROM track_credits WHERE track_credits.track_id = tracks.id)'
+                ))
+            conn.commit()
+            print("Migration: Added credits_fetched_at column")
+
+    if 'last_atmos_check_at' not in existing_columns:
+        with engine.connect() as conn:
+            if 'sqlite' in DATABASE_URL:
+                conn.execute(text('ALTER TABLE tracks ADD COLUMN last_atmos_check_at DATETIME'))
+            else:
+                conn.execute(text(
+                    'ALTER TABLE tracks ADD COLUMN IF NOT EXISTS last_atmos_check_at TIMESTAMP'
+                ))
+            conn.commit()
+            print("Migration: Added last_atmos_check_at column")
+
+    # Collapse duplicate votes (keeping the latest) before the unique
+    # (track_id, user_ip_hash) index below can be created
+    if 'community_ratings' in inspector.get_table_names():
+        rating_indexes = {idx['name'] for idx in inspector.get_indexes('community_ratings')}
+        if 'uq_community_ratings_track_voter' not in rating_indexes:
+            with engine.connect() as conn:
+                result = conn.execute(text(
+                    'DELETE FROM community_ratings WHERE id NOT IN '
+                    '(SELECT MAX(id) FROM community_ratings GROUP BY track_id, user_ip_hash)'
+                ))
+                conn.commit()
+                if result.rowcount:
+                    print(f"Migration: Removed {result.rowcount} duplicate community ratings")
+
+    # Same for region rows before the unique (track_id, storefront) index
+    if 'region_availability' in inspector.get_table_names():
+        region_indexes = {idx['name'] for idx in inspector.get_indexes('region_availability')}
+        if 'uq_region_availability_track_storefront' not in region_indexes:
+            with engine.connect() as conn:
+                result = conn.execute(text(
+                    'DELETE FROM region_availability WHERE id NOT IN '
+                    '(SELECT MAX(id) FROM region_availability GROUP BY track_id, storefront)'
+                ))
+                conn.commit()
+                if result.rowcount:
+                    print(
+                        f"Migration: Removed {result.rowcount} duplicate region availability rows"
+                    )
+
+    # create_all only creates indexes together with new tables, so add any
+    # indexes declared since an existing table was created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    # Single-column indexes since replaced by composites with the same leading column
+    with engine.connect() as conn:
+        for index_name in SUPERSEDED_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {index_name}'))
+        conn.commit()
+
+    # Rating aggregate trigger (statements are idempotent)
+    from sqlalchemy import DDL
+
+    from backend.models import RATING_AGGREGATE_TRIGGER_DDL
+
+    if 'community_ratings' in inspector.get_table_names():
+        with engine.connect() as conn:
+            for statement in RATING_AGGREGATE_TRIGGER_DDL.get(engine.dialect.name, []):
+                conn.execute(DDL(statement))
+            conn.commit()
+
 
 def get_db():
     """
@@ -2,25 +2,36 @@
 Main FastAPI application for SpatialSelects.com.
 Provides API endpoints for spatial audio track management and automatic detection.
 """
+import base64
 import hashlib
+import heapq
 import hmac
 import logging
 import os
+import socket
+import threading
 import time
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
-from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from backend.database import get_db, init_db
-from backend.models import CommunityRating, Engineer, Track, TrackCredit
-from backend.scheduler import start_scheduler, trigger_manual_refresh
+from backend.database import engine, get_db, init_db
+from backend.models import CommunityRating, Engineer, EngineerMixCount, Track, TrackCredit
+from backend.scheduler import start_scheduler, stop_scheduler, trigger_manual_refresh
 from backend.schemas import (
     EngineerResponse,
     RatingRequest,
@@ -28,6 +39,7 @@ from backend.schemas import (
     RefreshResponse,
     TrackResponse,
 )
+from backend.utils.redis_rate_limit import RedisRateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,48 +52,90 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if not os.getenv("ENVIRONMENT") == "production" else None,
     redoc_url="/redoc" if not os.getenv("ENVIRONMENT") == "production" else None,
+    # orjson serializes the large nested track listings much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # Request size limits (prevent DoS via large payloads)
 # Must be defined before SecurityHeadersMiddleware uses it
 MAX_REQUEST_SIZE = 1024 * 1024  # 1MB
+_TOO_LARGE_BODY = b"Request too large"
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware to add security headers to all responses."""
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI middleware to add security headers to all responses.
 
-    async def dispatch(self, request: StarletteRequest, call_next):
-        # Check request size (basic protection)
-        content_length = request.headers.get("content-length")
-        if content_length:
-            try:
-                size = int(content_length)
-                if size > MAX_REQUEST_SIZE:
-                    return Response(
-                        content="Request too large",
-                        status_code=413,
-                        headers={"Content-Type": "text/plain"}
-                    )
-            except ValueError:
-                pass  # Invalid content-length, let it through
-
-        response = await call_next(request)
-
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    Avoids BaseHTTPMiddleware's per-request task and body buffering by wrapping
+    `send` and injecting headers into the `http.response.start` message.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+        # Security headers, pre-encoded once
+        headers = [
+            (b"x-content-type-options", b"nosniff"),
+            (b"x-frame-options", b"DENY"),
+            (b"x-xss-protection", b"1; mode=block"),
+            (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        ]
 
         # HSTS (only in production with HTTPS)
         if IS_PRODUCTION:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-            response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' data:; connect-src 'self'; frame-ancestors 'none'; base-uri 'self'; form-action 'self';"
-        # Remove server header (information disclosure)
-        if "server" in response.headers:
-            del response.headers["server"]
+            headers.append((b"strict-transport-security", b"max-age=31536000; includeSubDomains"))
+            headers.append((
+                b"content-security-policy",
+                b"default-src 'self'; script-src 'self'; style-src 'self' 'unsafe-inline'; "
+                b"img-src 'self' data: https:; font-src 'self' data:; connect-src 'self'; "
+                b"frame-ancestors 'none'; base-uri 'self'; form-action 'self';",
+            ))
+
+        self._headers = headers
+        # Remove server header (information disclosure) and any value we override
+        self._stripped = frozenset({b"server"} | {name for name, _ in headers})
+
+        # 413 fast-reject, sent as raw ASGI messages without building a Response
+        self._too_large_start = {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"text/plain"),
+                (b"content-length", str(len(_TOO_LARGE_BODY)).encode()),
+            ] + headers,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        # Check request size (basic protection)
+        for key, value in scope["headers"]:
+            if key == b"content-length":
+                try:
+                    too_large = int(value) > MAX_REQUEST_SIZE
+                except ValueError:
+                    too_large = False  # Invalid content-length, let it through
+                if too_large:
+                    await send(self._too_large_start)
+                    await send({"type": "http.response.body", "body": _TOO_LARGE_BODY})
+                    return
+                break
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    header for header in message.get("headers", [])
+                    if header[0].lower() not in self._stripped
+                ] + self._headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+# Compress large JSON responses (track listings); innermost so it wraps the app directly
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Add security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
@@ -90,6 +144,12 @@ app.add_middleware(SecurityHeadersMiddleware)
 # In production, NEVER use "*" - specify exact origins
 ALLOWED_ORIGINS_ENV = os.getenv("ALLOWED_ORIGINS", "")
 IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
+# Resolved once at startup - environment variables don't change per request
+TRUST_PROXY = os.getenv("TRUST_PROXY", "false").lower() == "true"
+REFRESH_API_TOKEN = os.getenv("REFRESH_API_TOKEN")
+_REFRESH_TOKEN_BYTES = REFRESH_API_TOKEN.encode("utf-8") if REFRESH_API_TOKEN else None
+_DEFAULT_RATING_IP_SALT = "default-salt-change-in-production"
+RATING_IP_SALT = os.getenv("RATING_IP_SALT", _DEFAULT_RATING_IP_SALT)
 
 if IS_PRODUCTION:
     if not ALLOWED_ORIGINS_ENV or ALLOWED_ORIGINS_ENV == "*":
@@ -112,44 +172,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Rate limiting storage (in-memory, simple implementation)
 # NOTE: This is a basic implementation suitable for single-instance deployments.
 # For production with multiple instances, use Redis or similar distributed cache.
-rate_limit_store = {}
+# Per-IP deque of monotonic request timestamps, oldest on the left
+rate_limit_store: Dict[str, Deque[float]] = defaultdict(deque)
 RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
 RATE_LIMIT_MAX_REQUESTS = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "100"))  # per window per IP
-_last_cleanup_time = time.time()
+_last_cleanup_time = time.monotonic()
 CLEANUP_INTERVAL = 300  # Clean up old entries every 5 minutes
+CLEANUP_MIN_STORE_SIZE = 1024  # Skip periodic cleanup while the store is this small
+RATE_LIMIT_MAX_TRACKED_IPS = 10000  # Hard cap on tracked IPs (DoS protection)
+# Guards rate_limit_store; uncontended acquire is cheap and keeps the store
+# consistent if the limiter is ever called from threadpool endpoints
+_rate_limit_lock = threading.Lock()
+
+# Optional shared store for multi-instance deployments (falls back to memory)
+REDIS_URL = os.getenv("REDIS_URL")
+redis_rate_limiter = (
+    RedisRateLimiter(REDIS_URL, RATE_LIMIT_WINDOW, RATE_LIMIT_MAX_REQUESTS) if REDIS_URL else None
+)
 
 
-def _cleanup_rate_limit_store():
-    """Periodically clean up old rate limit entries to prevent memory leaks."""
+def _cleanup_rate_limit_store(force: bool = False):
+    """
+    Periodically clean up old rate limit entries to prevent memory leaks.
+    Must be called with _rate_limit_lock held.
+    """
     global _last_cleanup_time
-    current_time = time.time()
+    current_time = time.monotonic()
 
-    # Only cleanup every CLEANUP_INTERVAL seconds
-    if current_time - _last_cleanup_time < CLEANUP_INTERVAL:
+    # Only cleanup every CLEANUP_INTERVAL seconds (unless forced)
+    if not force and current_time - _last_cleanup_time < CLEANUP_INTERVAL:
         return
 
     _last_cleanup_time = current_time
     cutoff_time = current_time - RATE_LIMIT_WINDOW
 
-    # Remove IPs with no recent requests
+    # Remove IPs with no recent requests (newest timestamp is on the right)
     ips_to_remove = [
         ip for ip, req_times in rate_limit_store.items()
-        if not req_times or max(req_times, default=0) < cutoff_time
+        if not req_times or req_times[-1] < cutoff_time
     ]
     for ip in ips_to_remove:
         del rate_limit_store[ip]
 
     # Clean old requests from remaining IPs
-    for ip in list(rate_limit_store.keys()):
-        rate_limit_store[ip] = [
-            req_time for req_time in rate_limit_store[ip]
-            if req_time >= cutoff_time
-        ]
+    for req_times in rate_limit_store.values():
+        while req_times and req_times[0] < cutoff_time:
+            req_times.popleft()
 
 
 # Rate limiting function
@@ -163,6 +237,8 @@ def check_rate_limit(client_ip: str) -> bool:
 
     **Algorithm:**
     - Sliding window: Tracks all requests within the configured time window
+    - Per-IP deque of time.monotonic() timestamps; expired entries are popped
+      from the left instead of rebuilding the list
     - Per-IP tracking: Each IP address has independent rate limits
     - Automatic cleanup: Removes expired entries to prevent memory leaks
     - Configurable limits: Via RATE_LIMIT_WINDOW and RATE_LIMIT_MAX_REQUESTS env vars
@@ -173,9 +249,10 @@ def check_rate_limit(client_ip: str) -> bool:
     - Max tracked IPs: 10,000 (hard limit to prevent DoS)
 
     **Memory Management:**
-    - Periodic cleanup every 5 minutes (CLEANUP_INTERVAL)
-    - Aggressive cleanup when store exceeds 10,000 IPs
-    - Keeps only 5,000 most recent IPs when limit exceeded
+    - Periodic cleanup every 5 minutes (CLEANUP_INTERVAL), only once the store
+      holds at least CLEANUP_MIN_STORE_SIZE IPs
+    - Aggressive cleanup when store exceeds 10,000 IPs (expired IPs first)
+    - If still over the cap, evicts least recently active IPs down to 5,000
     - Removes all expired request timestamps
 
     **Security Considerations:**
@@ -185,8 +262,8 @@ def check_rate_limit(client_ip: str) -> bool:
     - Consider Redis or database-backed storage for production scaling
 
     **Thread Safety:**
-    - WARNING: Not thread-safe in current implementation
-    - Use with single-threaded ASGI server or add locking for multi-threaded
+    - The store is guarded by _rate_limit_lock, so concurrent callers cannot
+      both pass the read-then-append check
 
     **Rate Limit Exceeded Behavior:**
     - Logs warning with truncated IP (first 8 chars for privacy)
@@ -214,49 +291,67 @@ def check_rate_limit(client_ip: str) -> bool:
         - _cleanup_rate_limit_store(): Periodic cleanup of expired entries
 
     Performance:
-        - O(n) where n = number of requests in window for this IP
+        - Amortized O(1) per request (each timestamp is appended and popped once)
         - Cleanup is O(m) where m = total number of tracked IPs
         - Typical case: O(1) for checking single IP
     """
-    # Prevent rate limit store from growing unbounded
-    if len(rate_limit_store) > 10000:  # Max 10k unique IPs
-        logger.warning("Rate limit store size exceeded threshold, performing aggressive cleanup")
-        _cleanup_rate_limit_store()
-        # If still too large, clear oldest entries
-        if len(rate_limit_store) > 10000:
-            sorted_ips = sorted(
-                rate_limit_store.items(),
-                key=lambda x: max(x[1], default=0),
-                reverse=True
+    with _rate_limit_lock:
+        # Prevent rate limit store from growing unbounded
+        if len(rate_limit_store) > RATE_LIMIT_MAX_TRACKED_IPS:
+            logger.warning(
+                "Rate limit store size exceeded threshold, performing aggressive cleanup"
             )
-            # Keep only top 5000 most recent IPs
-            rate_limit_store.clear()
-            rate_limit_store.update(dict(sorted_ips[:5000]))
-
-    current_time = time.time()
+            # Drop only IPs whose requests have all expired - active counters are kept
+            _cleanup_rate_limit_store(force=True)
+            # If still too large, evict the least recently active IPs in place
+            # (O(n log k); newest timestamp is dq[-1]) instead of clearing the store
+            if len(rate_limit_store) > RATE_LIMIT_MAX_TRACKED_IPS:
+                excess = len(rate_limit_store) - RATE_LIMIT_MAX_TRACKED_IPS // 2
+                for ip, _ in heapq.nsmallest(
+                    excess,
+                    rate_limit_store.items(),
+                    key=lambda x: x[1][-1] if x[1] else 0
+                ):
+                    del rate_limit_store[ip]
+
+        current_time = time.monotonic()
+
+        # Periodic cleanup to prevent memory leaks (skipped entirely for small stores)
+        if (
+            len(rate_limit_store) >= CLEANUP_MIN_STORE_SIZE
+            and current_time - _last_cleanup_time >= CLEANUP_INTERVAL
+        ):
+            _cleanup_rate_limit_store()
+
+        # Drop expired entries for this IP from the left (entry created on first access)
+        req_times = rate_limit_store[client_ip]
+        cutoff_time = current_time - RATE_LIMIT_WINDOW
+        while req_times and req_times[0] < cutoff_time:
+            req_times.popleft()
+
+        # Check limit
+        if len(req_times) >= RATE_LIMIT_MAX_REQUESTS:
+            logger.warning(f"Rate limit exceeded for IP: {client_ip[:8]}...")
+            return False
 
-    # Periodic cleanup to prevent memory leaks
-    _cleanup_rate_limit_store()
+        # Add current request
+        req_times.append(current_time)
+        return True
 
-    # Initialize IP entry if not exists
-    if client_ip not in rate_limit_store:
-        rate_limit_store[client_ip] = []
 
-    # Clean old entries for this IP
-    cutoff_time = current_time - RATE_LIMIT_WINDOW
-    rate_limit_store[client_ip] = [
-        req_time for req_time in rate_limit_store[client_ip]
-        if req_time >= cutoff_time
-    ]
-
-    # Check limit
-    if len(rate_limit_store[client_ip]) >= RATE_LIMIT_MAX_REQUESTS:
-        logger.warning(f"Rate limit exceeded for IP: {client_ip[:8]}...")
-        return False
+async def check_shared_rate_limit(client_ip: str) -> bool:
+    """
+    Check the general API rate limit in Redis when REDIS_URL is configured,
+    otherwise (or if Redis is unreachable) with the in-memory check_rate_limit().
+    """
+    if redis_rate_limiter is not None:
+        allowed = await redis_rate_limiter.check_rate_limit(client_ip)
+        if allowed is not None:
+            if not allowed:
+                logger.warning(f"Rate limit exceeded for IP: {client_ip[:8]}...")
+            return allowed
 
-    # Add current request
-    rate_limit_store[client_ip].append(current_time)
-    return True
+    return check_rate_limit(client_ip)
 
 
 def get_client_ip(request: Request) -> str:
@@ -303,13 +398,13 @@ def get_client_ip(request: Request) -> str:
     - Do NOT enable TRUST_PROXY if directly exposed to internet
     - Misconfigured TRUST_PROXY allows IP spoofing attacks
 
-    **IPv4 Validation:**
-    - Splits IP into 4 octets
-    - Validates each octet is numeric and in range 0-255
-    - Rejects invalid formats (IPv6 not currently supported)
+    **IP Validation:**
+    - X-Real-IP must be a dotted-quad IPv4 address (checked via socket.inet_pton)
+    - X-Forwarded-For's first entry must be a valid IPv4 or IPv6 address
+    - Rejects invalid formats (IPv6 not currently supported for X-Real-IP)
 
     **Environment Variables:**
-    - `TRUST_PROXY` (default: "false")
+    - `TRUST_PROXY` (default: "false", read once at startup)
       - Set to "true" when behind nginx, HAProxy, CloudFlare, etc.
       - Leave "false" when directly exposed to internet
 
@@ -354,7 +449,7 @@ def get_client_ip(request: Request) -> str:
         >>> get_client_ip(request)  # Returns "203.0.113.42"
 
         >>> # Behind proxy with X-Forwarded-For
-        >>> os.environ["TRUST_PROXY"] = "true"
+        >>> # Started with TRUST_PROXY=true
         >>> request.headers["X-Forwarded-For"] = "203.0.113.42, 198.51.100.17"
         >>> get_client_ip(request)  # Returns "203.0.113.42"
 
@@ -369,41 +464,85 @@ def get_client_ip(request: Request) -> str:
         - RFC 7239: Forwarded HTTP Extension (modern alternative to X-Forwarded-For)
         - https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/X-Forwarded-For
     """
+    client_host = request.client.host if request.client else None
+    return _resolve_client_ip(
+        request.headers.get("X-Real-IP"),
+        request.headers.get("X-Forwarded-For"),
+        client_host
+    )
+
+
+def _is_valid_ip(ip: str, families: Tuple[int, ...]) -> bool:
+    """Check that `ip` is a well-formed address in one of the given socket families."""
+    for family in families:
+        try:
+            socket.inet_pton(family, ip)
+            return True
+        except (OSError, ValueError):
+            continue
+    return False
+
+
+def _resolve_client_ip(
+    real_ip: Optional[str],
+    forwarded: Optional[str],
+    client_host: Optional[str]
+) -> str:
+    """Apply the header priority and validation rules documented in get_client_ip()."""
     # Priority order for IP extraction (most trusted first)
     # X-Real-IP is typically set by reverse proxies (nginx, etc.)
-    real_ip = request.headers.get("X-Real-IP")
     if real_ip:
-        # Validate IP format (basic check)
-        ip_parts = real_ip.strip().split(".")
-        if len(ip_parts) == 4 and all(part.isdigit() and 0 <= int(part) <= 255 for part in ip_parts):
-            return real_ip.strip()
+        # Validate IPv4 format (single C call)
+        ip = real_ip.strip()
+        if _is_valid_ip(ip, (socket.AF_INET,)):
+            return ip
 
     # X-Forwarded-For can be spoofed, so we take the first (original) IP
-    # Only trust if we're behind a known proxy (check via environment)
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded and os.getenv("TRUST_PROXY", "false").lower() == "true":
+    # Only trust if we're behind a known proxy (TRUST_PROXY, read at startup)
+    if forwarded and TRUST_PROXY:
         # Take first IP in chain (original client)
         first_ip = forwarded.split(",")[0].strip()
-        # Basic validation
-        if first_ip and not first_ip.startswith("unknown"):
+        # Validate format (rejects "unknown" and other non-IP values)
+        if _is_valid_ip(first_ip, (socket.AF_INET, socket.AF_INET6)):
             return first_ip
 
     # Fallback to direct connection IP
-    if request.client:
-        return request.client.host
+    if client_host:
+        return client_host
 
     return "unknown"
 
 
+async def rate_limited_ip(request: Request) -> str:
+    """
+    Dependency enforcing the general API rate limit; returns the client IP.
+
+    Attached to every route on rate_limited_router. Endpoints that need the IP
+    can depend on it again - FastAPI caches it per request, so the check runs once.
+    Router dependencies are resolved before the endpoint's own, so throttled
+    requests never open a DB session.
+    """
+    client_ip = get_client_ip(request)
+    if not await check_shared_rate_limit(client_ip):
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please try again later.",
+            headers={"Retry-After": str(RATE_LIMIT_WINDOW)},
+        )
+    return client_ip
+
+
+# Routes subject to the general API rate limit; included into the app at the end of the module
+rate_limited_router = APIRouter(dependencies=[Depends(rate_limited_ip)])
+
+
 # Authentication for sensitive endpoints
 def verify_refresh_token(authorization: Optional[str] = Header(None)) -> bool:
     """
     Verify refresh token for /api/refresh endpoint.
     Uses constant-time comparison to prevent timing attacks.
     """
-    refresh_token = os.getenv("REFRESH_API_TOKEN")
-
-    if not refresh_token:
+    if not _REFRESH_TOKEN_BYTES:
         # If no token configured, allow in development but warn
         if not IS_PRODUCTION:
             logger.warning("REFRESH_API_TOKEN not set - allowing refresh in development mode")
@@ -415,15 +554,17 @@ def verify_refresh_token(authorization: Optional[str] = Header(None)) -> bool:
     if not authorization or not authorization.startswith("Bearer "):
         return False
 
-    token = authorization.replace("Bearer ", "").strip()
+    # Strip only the leading scheme ("Bearer Bearer x" must not become "x")
+    token = authorization.removeprefix("Bearer ").strip()
 
     # Use constant-time comparison to prevent timing attacks
     # This ensures the comparison takes the same time regardless of where the mismatch occurs
-    if len(token) != len(refresh_token):
+    token_bytes = token.encode('utf-8')
+    if len(token_bytes) != len(_REFRESH_TOKEN_BYTES):
         return False
 
     # Use hmac.compare_digest for constant-time comparison
-    return hmac.compare_digest(token.encode('utf-8'), refresh_token.encode('utf-8'))
+    return hmac.compare_digest(token_bytes, _REFRESH_TOKEN_BYTES)
 
 
 @app.on_event("startup")
@@ -436,14 +577,20 @@ async def startup_event():
 
     # Security warnings
     if IS_PRODUCTION:
-        if not os.getenv("REFRESH_API_TOKEN"):
+        if not REFRESH_API_TOKEN:
             logger.warning("SECURITY WARNING: REFRESH_API_TOKEN not set in production")
         if not ALLOWED_ORIGINS_ENV or ALLOWED_ORIGINS_ENV == "*":
             logger.warning("SECURITY WARNING: CORS allows all origins in production")
-        if os.getenv("RATING_IP_SALT", "default-salt-change-in-production") == "default-salt-change-in-production":
+        if RATING_IP_SALT == _DEFAULT_RATING_IP_SALT:
             logger.warning("SECURITY WARNING: Using default RATING_IP_SALT in production - set a secure random value")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the scheduler while its event loop is still running."""
+    stop_scheduler()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -454,65 +601,218 @@ async def root():
     }
 
 
-@app.get("/api/tracks", response_model=List[TrackResponse])
-async def get_tracks(
+# Allowed filter values for /api/tracks
+VALID_PLATFORMS = frozenset({"Apple Music", "Amazon Music"})
+VALID_FORMATS = frozenset({"Dolby Atmos", "360 Reality Audio"})
+_INVALID_PLATFORM_DETAIL = f"Invalid platform. Must be one of: {', '.join(sorted(VALID_PLATFORMS))}"
+_INVALID_FORMAT_DETAIL = f"Invalid format. Must be one of: {', '.join(sorted(VALID_FORMATS))}"
+
+# Track data only changes when the scheduler or a rating writes, so read endpoints
+# can be revalidated cheaply with a weak ETag instead of re-serializing the tracks.
+TRACKS_CACHE_CONTROL = "public, max-age=60"
+
+
+def _tracks_etag(db: Session, *params) -> str:
+    """
+    Build a weak ETag from the current track data version and the request parameters.
+
+    The version is the latest track update, the track count (catches deletions) and
+    the newest credit id (credits are added without touching the track row).
+    """
+    latest_update, track_count, latest_credit = db.query(
+        func.max(Track.updated_at),
+        func.count(Track.id),
+        db.query(func.max(TrackCredit.id)).scalar_subquery(),
+    ).one()
+    # hashlib rather than hash(): str hashes are salted per process, so
+    # every worker would otherwise hand out different ETags for the same data
+    digest = hashlib.blake2b(
+        repr((latest_update, track_count, latest_credit, params)).encode(),
+        digest_size=8,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match request header against an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+# Encoded /api/tracks bodies keyed by query parameters, stored with the ETag they
+# were built for so a data change is never served from cache. The landing page
+# (defaults, no filters) hits the same entry on almost every request.
+TRACKS_CACHE_TTL = 30
+_tracks_cache: TTLCache = TTLCache(maxsize=64, ttl=TRACKS_CACHE_TTL)
+_tracks_cache_lock = threading.Lock()
+
+# /api/stats aggregates, single entry; data only changes on syncs
+STATS_CACHE_TTL = 60
+_stats_cache: TTLCache = TTLCache(maxsize=1, ttl=STATS_CACHE_TTL)
+_stats_cache_lock = threading.Lock()
+
+
+def _invalidate_response_caches():
+    """Drop cached track listings and stats after a sync changed the data."""
+    with _tracks_cache_lock:
+        _tracks_cache.clear()
+    with _stats_cache_lock:
+        _stats_cache.clear()
+
+
+# Track lists are serialized directly instead of through response_model, which
+# would validate every ORM row a second time before encoding
+_TRACK_LIST_ADAPTER = TypeAdapter(List[TrackResponse])
+# Keeps the schema in the OpenAPI docs for routes without response_model
+_TRACK_LIST_RESPONSES = {200: {"model": List[TrackResponse]}}
+
+
+def _dump_tracks(tracks: List[Track]) -> bytes:
+    """Validate ORM tracks against TrackResponse and encode them to JSON in one pass."""
+    return _TRACK_LIST_ADAPTER.dump_json(
+        _TRACK_LIST_ADAPTER.validate_python(tracks, from_attributes=True)
+    )
+
+
+def _set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = TRACKS_CACHE_CONTROL
+
+
+def _encoded_json_response(body: bytes, etag: str, next_cursor: Optional[str] = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": TRACKS_CACHE_CONTROL}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _encode_tracks_cursor(track: Track) -> str:
+    """Encode the sort key of the last track on a page as an opaque cursor."""
+    atmos = track.atmos_release_date.isoformat() if track.atmos_release_date else None
+    payload = orjson.dumps([atmos, track.release_date.isoformat(), track.id])
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_tracks_cursor(cursor: str) -> Tuple[Optional[datetime], datetime, int]:
+    """Decode a cursor produced by _encode_tracks_cursor(); 400 if malformed."""
+    try:
+        atmos, release, track_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (
+            datetime.fromisoformat(atmos) if atmos is not None else None,
+            datetime.fromisoformat(release),
+            int(track_id),
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def _tracks_after_cursor(atmos: Optional[datetime], release: datetime, track_id: int):
+    """
+    Filter for tracks sorting after the cursor in the listing order
+    (atmos_release_date DESC NULLS LAST, release_date DESC, id DESC).
+
+    A plain row-value comparison can't be used for the first key because
+    NULL atmos dates sort last instead of comparing.
+    """
+    release_after = tuple_(Track.release_date, Track.id) < tuple_(release, track_id)
+    if atmos is None:
+        return and_(Track.atmos_release_date.is_(None), release_after)
+    return or_(
+        Track.atmos_release_date < atmos,
+        Track.atmos_release_date.is_(None),
+        and_(Track.atmos_release_date == atmos, release_after),
+    )
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": TRACKS_CACHE_CONTROL},
+    )
+
+
+@rate_limited_router.get("/api/tracks", responses=_TRACK_LIST_RESPONSES)
+def get_tracks(
     request: Request,
     platform: Optional[str] = Query(None, max_length=50, description="Filter by platform"),
     format: Optional[str] = Query(None, max_length=50, description="Filter by audio format"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of tracks to return"),
-    offset: int = Query(0, ge=0, le=10000, description="Number of tracks to skip"),
+    cursor: Optional[str] = Query(
+        None, max_length=200, description="X-Next-Cursor value from the previous page"
+    ),
     db: Session = Depends(get_db)
 ):
     """
     Get all spatial audio tracks with optional filtering.
+
+    Uses keyset pagination: when more tracks may follow, the response carries an
+    X-Next-Cursor header to pass back as `cursor` for the next page.
     
     Args:
+        request: Incoming request (for If-None-Match)
         platform: Filter by platform (Apple Music, Amazon Music)
         format: Filter by audio format (Dolby Atmos, 360 Reality Audio)
         limit: Maximum number of tracks to return (1-1000)
-        offset: Number of tracks to skip (0-10000)
+        cursor: Opaque cursor from the previous page's X-Next-Cursor header
         db: Database session
     
     Returns:
-        List of tracks matching the filters
+        List of tracks matching the filters, or 304 if the client's copy is current
     """
-    # Rate limiting
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-
-    # Validate platform and format values to prevent injection
-    valid_platforms = ["Apple Music", "Amazon Music"]
-    valid_formats = ["Dolby Atmos", "360 Reality Audio"]
-
     query = db.query(Track).options(
-        joinedload(Track.credits).joinedload(TrackCredit.engineer)
+        selectinload(Track.credits).selectinload(TrackCredit.engineer)
     )
 
+    # Validate platform and format values to prevent injection
     if platform:
-        if platform not in valid_platforms:
-            raise HTTPException(status_code=400, detail=f"Invalid platform. Must be one of: {', '.join(valid_platforms)}")
+        if platform not in VALID_PLATFORMS:
+            raise HTTPException(status_code=400, detail=_INVALID_PLATFORM_DETAIL)
         query = query.filter(Track.platform == platform)
 
     if format:
-        if format not in valid_formats:
-            raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {', '.join(valid_formats)}")
+        if format not in VALID_FORMATS:
+            raise HTTPException(status_code=400, detail=_INVALID_FORMAT_DETAIL)
         query = query.filter(Track.format == format)
 
+    if cursor:
+        query = query.filter(_tracks_after_cursor(*_decode_tracks_cursor(cursor)))
+
+    # Revalidate before running the track/credits queries
+    etag = _tracks_etag(db, platform, format, limit, cursor)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    cache_key = (platform, format, limit, cursor)
+    with _tracks_cache_lock:
+        cached = _tracks_cache.get(cache_key)
+    if cached is not None and cached[0] == etag:
+        return _encoded_json_response(cached[1], etag, cached[2])
+
     # Order by Atmos release date descending (newest first), fallback to release_date
     # Use nullslast() to put tracks without atmos_release_date at the end
     from sqlalchemy import desc, nullslast
+    # id breaks ties so the keyset cursor is unambiguous
     query = query.order_by(
         nullslast(desc(Track.atmos_release_date)),
-        desc(Track.release_date)
+        desc(Track.release_date),
+        desc(Track.id)
     )
 
-    tracks = query.offset(offset).limit(limit).all()
-    return tracks
+    tracks = query.limit(limit).all()
+    next_cursor = _encode_tracks_cursor(tracks[-1]) if len(tracks) == limit else None
+    body = _dump_tracks(tracks)
+    with _tracks_cache_lock:
+        _tracks_cache[cache_key] = (etag, body, next_cursor)
+
+    return _encoded_json_response(body, etag, next_cursor)
 
 
-@app.get("/api/tracks/new", response_model=List[TrackResponse])
-async def get_new_tracks(
+@rate_limited_router.get("/api/tracks/new", responses=_TRACK_LIST_RESPONSES)
+def get_new_tracks(
     request: Request,
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
@@ -521,26 +821,27 @@ async def get_new_tracks(
     Get tracks released within the specified number of days.
     
     Args:
+        request: Incoming request (for If-None-Match)
         days: Number of days to look back (1-365, default: 30)
         db: Database session
     
     Returns:
-        List of recently released tracks
+        List of recently released tracks, or 304 if the client's copy is current
     """
-    # Rate limiting
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-
     try:
-        cutoff_date = datetime.now() - timedelta(days=days)
+        # Minute resolution so the cutoff (and therefore the ETag) is stable between requests
+        cutoff_date = (datetime.utcnow() - timedelta(days=days)).replace(second=0, microsecond=0)
+        etag = _tracks_etag(db, "new", cutoff_date)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+
         tracks = db.query(Track).options(
-            joinedload(Track.credits).joinedload(TrackCredit.engineer)
+            selectinload(Track.credits).selectinload(TrackCredit.engineer)
         ).filter(
             Track.release_date >= cutoff_date
         ).order_by(Track.release_date.desc()).all()
 
-        return tracks
+        return _encoded_json_response(_dump_tracks(tracks), etag)
     except Exception as e:
         logger.error(f"Error fetching new tracks: {e}", exc_info=True)
         raise HTTPException(
@@ -549,9 +850,10 @@ async def get_new_tracks(
         )
 
 
-@app.get("/api/tracks/{track_id}", response_model=TrackResponse)
-async def get_track(
+@rate_limited_router.get("/api/tracks/{track_id}", response_model=TrackResponse)
+def get_track(
     request: Request,
+    response: Response,
     track_id: int,
     db: Session = Depends(get_db)
 ):
@@ -559,27 +861,29 @@ async def get_track(
     Get a specific track by ID.
     
     Args:
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for caching headers)
         track_id: Track ID (must be positive integer)
         db: Database session
     
     Returns:
-        Track details
+        Track details, or 304 if the client's copy is current
     """
-    # Rate limiting
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-
     # Validate track_id is positive
     if track_id <= 0 or track_id > 2147483647:
         raise HTTPException(status_code=400, detail="Track ID must be a positive integer")
 
     try:
+        etag = _tracks_etag(db, "track", track_id)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+
         track = db.query(Track).options(
-            joinedload(Track.credits).joinedload(TrackCredit.engineer)
+            selectinload(Track.credits).selectinload(TrackCredit.engineer)
         ).filter(Track.id == track_id).first()
         if not track:
             raise HTTPException(status_code=404, detail="Track not found")
+        _set_cache_headers(response, etag)
         return track
     except HTTPException:
         raise
@@ -591,10 +895,10 @@ async def get_track(
         )
 
 
-@app.post("/api/refresh", response_model=RefreshResponse)
+@rate_limited_router.post("/api/refresh", response_model=RefreshResponse)
 async def refresh_data(
-    request: Request,
     authorization: Optional[str] = Header(None),
+    client_ip: str = Depends(rate_limited_ip),
     db: Session = Depends(get_db)
 ):
     """
@@ -608,11 +912,6 @@ async def refresh_data(
     Returns:
         Refresh status and statistics
     """
-    # Rate limiting (stricter for authenticated endpoint)
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-
     # Authentication check
     if not verify_refresh_token(authorization):
         raise HTTPException(
@@ -623,6 +922,7 @@ async def refresh_data(
 
     try:
         result = await trigger_manual_refresh(db)
+        _invalidate_response_caches()
         # Log without sensitive information
         logger.info(f"Manual refresh triggered by IP: {client_ip[:8]}...")
         return result
@@ -647,13 +947,21 @@ async def health_check():
 
 
 # Public refresh rate limiting - much stricter (1 per hour per IP)
-# NOTE: This is in-memory only and will be lost on server restart.
-# For production with multiple instances or persistent rate limiting,
-# consider using Redis or database-backed storage.
-# This is acceptable for single-instance deployments where occasional
-# rate limit resets on restart are acceptable.
-public_refresh_store = {}
+# NOTE: The in-memory store is lost on server restart and not shared between
+# instances; set REDIS_URL for a shared store (see start_public_refresh()).
+# Entries expire with the cooldown and the store is bounded, so it can't grow
+# without limit under many distinct IPs.
 PUBLIC_REFRESH_COOLDOWN = 3600  # 1 hour in seconds
+PUBLIC_REFRESH_MAX_TRACKED_IPS = 100_000
+public_refresh_store: TTLCache = TTLCache(
+    maxsize=PUBLIC_REFRESH_MAX_TRACKED_IPS, ttl=PUBLIC_REFRESH_COOLDOWN
+)
+
+# The frontend polls /api/refresh/status on every page view; repeated polls from
+# one IP within a few seconds share one lookup (a Redis round-trip when configured).
+# The cooldown is measured in minutes, so a few seconds of staleness is harmless.
+REFRESH_STATUS_CACHE_TTL = 5
+_refresh_status_cache: TTLCache = TTLCache(maxsize=10_000, ttl=REFRESH_STATUS_CACHE_TTL)
 
 
 def check_public_refresh_limit(client_ip: str) -> Tuple[bool, int]:
@@ -685,17 +993,18 @@ def check_public_refresh_limit(client_ip: str) -> Tuple[bool, int]:
     4. If elapsed >= cooldown or no previous refresh, return (True, 0)
 
     **Storage Characteristics:**
-    - **Type:** In-memory dictionary (public_refresh_store)
+    - **Type:** In-memory TTLCache (public_refresh_store)
     - **Persistence:** Lost on server restart (acceptable trade-off)
-    - **Cleanup:** No automatic cleanup (acceptable for low refresh volume)
-    - **Scaling:** Not shared across multiple server instances
+    - **Cleanup:** Entries expire after the cooldown; size capped at
+      PUBLIC_REFRESH_MAX_TRACKED_IPS (least recently used evicted first)
+    - **Scaling:** Not shared across multiple server instances (use REDIS_URL)
 
     **Multi-Instance Deployment:**
-    For production deployments with multiple server instances:
-    - Current implementation is NOT shared across instances
-    - Each instance has independent rate limit tracking
-    - Users could bypass limit by hitting different instances
-    - Solution: Use Redis or database-backed storage for shared state
+    This is the in-memory fallback behind get_public_refresh_status() and
+    start_public_refresh(), which use Redis when REDIS_URL is set:
+    - Without Redis, each instance has independent cooldown tracking
+    - Users could bypass the limit by hitting different instances
+    - With Redis, the cooldown is one shared key per IP, started with SET NX
 
     **Security Implications:**
     - IP-based limiting can be bypassed by:
@@ -748,7 +1057,11 @@ def check_public_refresh_limit(client_ip: str) -> Tuple[bool, int]:
         - Uses time.time() for Unix timestamp tracking
         - Integer arithmetic for second calculations
         - No exception handling (assumes valid inputs)
-        - Thread-safe for single-threaded ASGI (not multi-threaded)
+        - Takes no lock (unlike rate_limit_store, which uses _rate_limit_lock):
+          it is only called from coroutines on the event loop, and
+          start_public_refresh() checks and records without awaiting in
+          between, so the check-and-set cannot interleave. Do not call it
+          from worker threads
 
     Configuration:
         - PUBLIC_REFRESH_COOLDOWN: Global constant (3600 seconds)
@@ -760,17 +1073,75 @@ def check_public_refresh_limit(client_ip: str) -> Tuple[bool, int]:
         - check_rate_limit(): General API rate limiting
         - get_refresh_status(): Returns current cooldown status to frontend
     """
-    current_time = time.time()
-
-    if client_ip in public_refresh_store:
-        last_refresh = public_refresh_store[client_ip]
-        elapsed = current_time - last_refresh
+    # Expired entries are dropped by the cache, so presence means "in cooldown"
+    last_refresh = public_refresh_store.get(client_ip)
+    if last_refresh is not None:
+        elapsed = time.time() - last_refresh
         if elapsed < PUBLIC_REFRESH_COOLDOWN:
             return False, int(PUBLIC_REFRESH_COOLDOWN - elapsed)
 
     return True, 0
 
 
+async def get_public_refresh_status(client_ip: str) -> Tuple[bool, int]:
+    """
+    Shared-store aware version of check_public_refresh_limit().
+    Uses Redis when configured, falling back to the in-memory store.
+    Results are cached for REFRESH_STATUS_CACHE_TTL seconds per IP.
+    """
+    status = _refresh_status_cache.get(client_ip)
+    if status is not None:
+        return status
+
+    status = None
+    if redis_rate_limiter is not None:
+        seconds_remaining = await redis_rate_limiter.refresh_seconds_remaining(
+            client_ip, PUBLIC_REFRESH_COOLDOWN
+        )
+        if seconds_remaining is not None:
+            status = (seconds_remaining == 0, seconds_remaining)
+    if status is None:
+        status = check_public_refresh_limit(client_ip)
+
+    _refresh_status_cache[client_ip] = status
+    return status
+
+
+async def start_public_refresh(client_ip: str) -> Tuple[bool, int]:
+    """
+    Atomically check the public refresh limit and record a refresh.
+    Always checks the store itself, never the cached status.
+
+    Returns:
+        (started, seconds_remaining) - same shape as check_public_refresh_limit()
+    """
+    if redis_rate_limiter is not None:
+        acquired = await redis_rate_limiter.acquire_refresh(client_ip, PUBLIC_REFRESH_COOLDOWN)
+        if acquired:
+            # Drop a status cached while the cooldown was being recorded
+            _refresh_status_cache.pop(client_ip, None)
+            return True, 0
+        if acquired is False:
+            seconds_remaining = await redis_rate_limiter.refresh_seconds_remaining(
+                client_ip, PUBLIC_REFRESH_COOLDOWN
+            )
+            return False, seconds_remaining or PUBLIC_REFRESH_COOLDOWN
+
+    allowed, seconds_remaining = check_public_refresh_limit(client_ip)
+    if allowed:
+        public_refresh_store[client_ip] = time.time()
+        _refresh_status_cache.pop(client_ip, None)
+    return allowed, seconds_remaining
+
+
+async def release_public_refresh(client_ip: str):
+    """Clear a recorded public refresh so the client can retry."""
+    _refresh_status_cache.pop(client_ip, None)
+    if redis_rate_limiter is not None:
+        await redis_rate_limiter.release_refresh(client_ip)
+    public_refresh_store.pop(client_ip, None)
+
+
 @app.post("/api/refresh/sync", response_model=RefreshResponse)
 async def public_refresh_data(
     request: Request,
@@ -788,8 +1159,8 @@ async def public_refresh_data(
     """
     client_ip = get_client_ip(request)
 
-    # Check public refresh rate limit
-    allowed, seconds_remaining = check_public_refresh_limit(client_ip)
+    # Check public refresh rate limit and record this refresh
+    allowed, seconds_remaining = await start_public_refresh(client_ip)
     if not allowed:
         minutes_remaining = seconds_remaining // 60
         raise HTTPException(
@@ -799,16 +1170,13 @@ async def public_refresh_data(
         )
 
     try:
-        # Record this refresh
-        public_refresh_store[client_ip] = time.time()
-
         result = await trigger_manual_refresh(db)
+        _invalidate_response_caches()
         logger.info(f"Public refresh triggered by {client_ip}: {result.tracks_added} added, {result.tracks_updated} updated")
         return result
     except Exception as e:
         # Remove the record if refresh failed so they can retry
-        if client_ip in public_refresh_store:
-            del public_refresh_store[client_ip]
+        await release_public_refresh(client_ip)
         logger.error(f"Error during public refresh: {e}")
         raise HTTPException(status_code=500, detail="Error refreshing data. Please try again later.")
 
@@ -822,7 +1190,7 @@ async def get_refresh_status(request: Request):
         Whether refresh is available and time until next refresh
     """
     client_ip = get_client_ip(request)
-    allowed, seconds_remaining = check_public_refresh_limit(client_ip)
+    allowed, seconds_remaining = await get_public_refresh_status(client_ip)
 
     return {
         "can_refresh": allowed,
@@ -831,8 +1199,8 @@ async def get_refresh_status(request: Request):
     }
 
 
-@app.get("/api/stats")
-async def get_stats(request: Request, db: Session = Depends(get_db)):
+@rate_limited_router.get("/api/stats")
+def get_stats(db: Session = Depends(get_db)):
     """
     Get statistics about the spatial audio database.
     
@@ -841,19 +1209,23 @@ async def get_stats(request: Request, db: Session = Depends(get_db)):
     
     Returns:
         Statistics including total tracks, tracks by platform, etc.
+        Cached for STATS_CACHE_TTL seconds.
     """
-    # Rate limiting
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
+    with _stats_cache_lock:
+        cached = _stats_cache.get("stats")
+    if cached is not None:
+        return cached
 
-    total_tracks = db.query(Track).count()
-    dolby_atmos_tracks = db.query(Track).filter(Track.format == "Dolby Atmos").count()
+    cutoff_date = datetime.utcnow() - timedelta(days=30)
 
-    cutoff_date = datetime.now() - timedelta(days=30)
-    new_tracks = db.query(Track).filter(Track.release_date >= cutoff_date).count()
+    # Conditional aggregation: one scan of tracks instead of one COUNT per statistic
+    total_tracks, dolby_atmos_tracks, new_tracks = db.query(
+        func.count(Track.id),
+        func.coalesce(func.sum(case((Track.format == "Dolby Atmos", 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Track.release_date >= cutoff_date, 1), else_=0)), 0),
+    ).one()
 
-    return {
+    stats = {
         "total_tracks": total_tracks,
         "by_platform": {
             "Apple Music": total_tracks
@@ -863,74 +1235,91 @@ async def get_stats(request: Request, db: Session = Depends(get_db)):
         },
         "new_tracks_last_30_days": new_tracks
     }
+    with _stats_cache_lock:
+        _stats_cache["stats"] = stats
+
+    return stats
 
 
 # Phase 3: Community & Quality API
-@app.post("/api/tracks/{track_id}/rate", response_model=RatingResponse)
-async def rate_track(
-    request: Request,
+# Precompiled Core statement reused by every rating submission. A repeat vote
+# from the same voter replaces their previous rating instead of adding a row.
+_rating_insert = (
+    pg_insert(CommunityRating)
+    if engine.dialect.name == "postgresql"
+    else sqlite_insert(CommunityRating)
+)
+_UPSERT_RATING_STMT = _rating_insert.on_conflict_do_update(
+    index_elements=[CommunityRating.track_id, CommunityRating.user_ip_hash],
+    set_={
+        "immersiveness_score": _rating_insert.excluded.immersiveness_score,
+        "is_fake_atmos": _rating_insert.excluded.is_fake_atmos,
+        "created_at": _rating_insert.excluded.created_at,
+    },
+)
+
+# Encoded once; user_ip_hash stays sha256(ip + salt) so votes stored earlier keep
+# matching (and upserting over) new votes from the same IP
+_RATING_IP_SALT_BYTES = RATING_IP_SALT.encode("utf-8")
+
+
+@rate_limited_router.post("/api/tracks/{track_id}/rate", response_model=RatingResponse)
+def rate_track(
     track_id: int,
     rating: RatingRequest,
+    client_ip: str = Depends(rate_limited_ip),
     db: Session = Depends(get_db)
 ):
     """
     Submit a community rating used for "Hall of Shame" or quality score.
     """
-    client_ip = get_client_ip(request)
-    if not check_rate_limit(client_ip):
-         raise HTTPException(status_code=429, detail="Rate limit exceeded.")
-
-    # Check if track exists
-    track = db.query(Track).filter(Track.id == track_id).first()
-    if not track:
+    # Check if track exists (single boolean, no row hydration)
+    track_exists = db.query(
+        db.query(Track.id).filter(Track.id == track_id).exists()
+    ).scalar()
+    if not track_exists:
         raise HTTPException(status_code=404, detail="Track not found")
 
     # Create simple IP hash with consistent salt from environment
     # This allows detecting duplicate votes from same IP while maintaining privacy
     # WARNING: A secure random salt should be set via RATING_IP_SALT environment variable
     # in production (startup warning will alert if using default)
-    salt = os.getenv("RATING_IP_SALT", "default-salt-change-in-production")
-    ip_hash = hashlib.sha256(f"{client_ip}{salt}".encode()).hexdigest()
-
-    # Save rating
-    new_rating = CommunityRating(
-        track_id=track_id,
-        immersiveness_score=rating.score,
-        is_fake_atmos=rating.is_fake,
-        user_ip_hash=ip_hash
-    )
-    db.add(new_rating)
-    db.commit()
-
-    # Calculate new averages
-    # (In high scale, do this async/background, but here inline is fine)
-    avg_score = db.query(func.avg(CommunityRating.immersiveness_score)).filter(CommunityRating.track_id == track_id).scalar()
-    fake_count = db.query(CommunityRating).filter(CommunityRating.track_id == track_id, CommunityRating.is_fake_atmos).count()
-    total = db.query(CommunityRating).filter(CommunityRating.track_id == track_id).count()
-    avg_value = float(avg_score) if avg_score is not None else 0.0
-
-    # Update track cache via SQLAlchemy's update method since direct attribute assignment to Column[Unknown] is not allowed.
-    update_data = {}
-    update_data['avg_immersiveness'] = avg_value
+    ip_hash = hashlib.sha256(client_ip.encode("utf-8") + _RATING_IP_SALT_BYTES).hexdigest()
 
-    # Determine hall of shame threshold (e.g., >30% fake reports with >5 votes)
-    if total > 5 and (fake_count / total) > 0.3:
-        update_data['hall_of_shame'] = True
-
-    if update_data:
-        db.query(Track).filter(Track.id == track_id).update(update_data, synchronize_session=False)
+    # Save rating via a Core upsert (no ORM instance / unit-of-work bookkeeping)
+    db.execute(_UPSERT_RATING_STMT, {
+        "track_id": track_id,
+        "immersiveness_score": rating.score,
+        "is_fake_atmos": rating.is_fake,
+        "user_ip_hash": ip_hash,
+    })
+
+    # The community_ratings trigger (see backend.models) has already refreshed
+    # tracks.avg_immersiveness and hall_of_shame in this transaction; read the
+    # cached average back together with the fake-report ratio in one row fetch
+    fake_ratio = select(
+        func.avg(case((CommunityRating.is_fake_atmos, 1.0), else_=0.0))
+    ).where(CommunityRating.track_id == track_id).scalar_subquery()
+    avg_score, fake_atmos_ratio = db.query(
+        Track.avg_immersiveness, fake_ratio
+    ).filter(Track.id == track_id).one()
 
     db.commit()
 
     return {
         "track_id": track_id,
-        "avg_immersiveness": avg_value,
-        "is_fake_atmos_ratio": fake_count / total if total > 0 else 0.0
+        "avg_immersiveness": float(avg_score) if avg_score is not None else 0.0,
+        "is_fake_atmos_ratio": float(fake_atmos_ratio) if fake_atmos_ratio is not None else 0.0
     }
 
 
-@app.get("/api/engineers", response_model=List[EngineerResponse])
-async def get_engineers(
+# Like the track lists: one validate + encode pass instead of building a model per
+# row and having response_model validate the list again
+_ENGINEER_LIST_ADAPTER = TypeAdapter(List[EngineerResponse])
+
+
+@app.get("/api/engineers", responses={200: {"model": List[EngineerResponse]}})
+def get_engineers(
     request: Request,
     limit: int = 50,
     min_mixes: int = 1,
@@ -939,24 +1328,31 @@ async def get_engineers(
     """
     Get list of engineers sorted by mix count.
     """
-    # Group by engineer and count track credits
-    # This query might need optimization for large datasets
+    # Read from the precomputed engineer_mix_counts table (rebuilt by the scheduler)
+    # so the aggregation never runs on the request path. Only the response columns
+    # are selected, so no ORM instances are built or lazily loaded.
     results = db.query(
-        Engineer,
-        func.count(TrackCredit.id).label('count')
-    ).join(TrackCredit).group_by(Engineer.id).having(func.count(TrackCredit.id) >= min_mixes).order_by(func.count(TrackCredit.id).desc()).limit(limit).all()
-
-    response = []
-    for eng, count in results:
-        resp = EngineerResponse.model_validate(eng)
-        resp.mix_count = count
-        response.append(resp)
-
-    return response
+        Engineer.id,
+        Engineer.name,
+        Engineer.slug,
+        Engineer.profile_image_url,
+        EngineerMixCount.mix_count
+    ).join(
+        EngineerMixCount, EngineerMixCount.engineer_id == Engineer.id
+    ).filter(
+        EngineerMixCount.mix_count >= min_mixes
+    ).order_by(
+        EngineerMixCount.mix_count.desc(), EngineerMixCount.engineer_id.desc()
+    ).limit(limit).all()
+
+    body = _ENGINEER_LIST_ADAPTER.dump_json(
+        _ENGINEER_LIST_ADAPTER.validate_python(results, from_attributes=True)
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/engineers/{engineer_id}", response_model=EngineerResponse)
-async def get_engineer_details(
+def get_engineer_details(
     request: Request,
     engineer_id: int,
     db: Session = Depends(get_db)
@@ -968,8 +1364,15 @@ async def get_engineer_details(
     if not engineer:
         raise HTTPException(status_code=404, detail="Engineer not found")
 
-    mix_count = db.query(TrackCredit).filter(TrackCredit.engineer_id == engineer_id).count()
+    # Plain COUNT over the (engineer_id, track_id) index; Query.count() would wrap
+    # a SELECT of every credit column in a subquery
+    mix_count = db.query(func.count()).select_from(TrackCredit).filter(
+        TrackCredit.engineer_id == engineer_id
+    ).scalar()
 
     resp = EngineerResponse.model_validate(engineer)
     resp.mix_count = mix_count
     return resp
+
+
+app.include_router(rate_limited_router)
@@ -3,7 +3,21 @@ SQLAlchemy models for spatial audio tracks.
 """
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    DDL,
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from backend.database import Base
@@ -20,8 +34,8 @@ class Engineer(Base):
     slug = Column(String(500), index=True)
     profile_image_url = Column(String(500), nullable=True)
 
-    # Relationships
-    credits = relationship("TrackCredit", back_populates="engineer")
+    # Relationships (lazy="raise": callers load them explicitly with selectinload)
+    credits = relationship("TrackCredit", back_populates="engineer", lazy="raise")
 
 
 class TrackCredit(Base):
@@ -29,10 +43,15 @@ class TrackCredit(Base):
     Association model linking tracks to engineers with specific roles.
     """
     __tablename__ = "track_credits"
+    __table_args__ = (
+        # Covers per-engineer counts (mix count rebuild, engineer details) as index-only
+        # scans; also serves plain engineer_id lookups, so no single-column index
+        Index("ix_track_credits_engineer_id_track_id", "engineer_id", "track_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False, index=True)
-    engineer_id = Column(Integer, ForeignKey("engineers.id"), nullable=False, index=True)
+    engineer_id = Column(Integer, ForeignKey("engineers.id"), nullable=False)
     role = Column(String(100), nullable=False)  # e.g., "Immersive Mix Engineer"
 
     # Relationships
@@ -44,14 +63,33 @@ class TrackCredit(Base):
         return self.engineer.name if self.engineer else "Unknown"
 
 
+class EngineerMixCount(Base):
+    """
+    Precomputed mix count per engineer.
+    Rebuilt by the scheduler so /api/engineers avoids aggregating on every request.
+    """
+    __tablename__ = "engineer_mix_counts"
+    __table_args__ = (
+        Index("ix_engineer_mix_counts_mix_count", "mix_count", "engineer_id"),
+    )
+
+    engineer_id = Column(Integer, ForeignKey("engineers.id"), primary_key=True)
+    mix_count = Column(Integer, nullable=False, default=0)
+
+
 class RegionAvailability(Base):
     """
     Model tracking track availability across different storefronts.
     """
     __tablename__ = "region_availability"
+    __table_args__ = (
+        # One row per track and storefront; the sync upserts against it. Also
+        # serves plain track_id lookups, so no single-column index
+        Index("uq_region_availability_track_storefront", "track_id", "storefront", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False, index=True)
+    track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False)
     storefront = Column(String(10), nullable=False, index=True)  # e.g., "us", "gb", "jp"
     is_available = Column(Boolean, default=True)
     format = Column(String(100), nullable=False)  # e.g., "Dolby Atmos", "Stereo"
@@ -65,9 +103,20 @@ class CommunityRating(Base):
     Model for community ratings and quality checks.
     """
     __tablename__ = "community_ratings"
+    __table_args__ = (
+        # Covers the per-track rating aggregate in rate_track as an index-only scan;
+        # also serves plain track_id lookups, so no single-column index
+        Index(
+            "ix_community_ratings_track_id_score_fake",
+            "track_id", "immersiveness_score", "is_fake_atmos",
+        ),
+        # One vote per voter per track; rate_track upserts against it.
+        # A unique index rather than a constraint so run_migrations can add it
+        Index("uq_community_ratings_track_voter", "track_id", "user_ip_hash", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False, index=True)
+    track_id = Column(Integer, ForeignKey("tracks.id"), nullable=False)
     immersiveness_score = Column(Integer, nullable=False)  # 1-10
     is_fake_atmos = Column(Boolean, default=False)
     user_ip_hash = Column(String(64), nullable=False, index=True)  # Anonymized user identifier
@@ -77,17 +126,34 @@ class CommunityRating(Base):
     track = relationship("Track", back_populates="ratings")
 
 
+_NEEDS_CREDITS_PREDICATE = (
+    "format = 'Dolby Atmos' AND music_link IS NOT NULL AND credits_fetched_at IS NULL"
+)
+
+
 class Track(Base):
     """
     Model representing a spatial audio track.
     """
     __tablename__ = "tracks"
+    __table_args__ = (
+        # Range scans for "<format> released since <date>" (new tracks, stats);
+        # also serves plain format lookups, so no single-column index
+        Index("ix_tracks_format_release_date", "format", "release_date"),
+        # Only the tracks scheduled_credits_fetch still has to scrape, so each
+        # poll reads a small index instead of anti-joining every Atmos track
+        Index(
+            "ix_tracks_needing_credits", "credits_fetched_at",
+            sqlite_where=text(_NEEDS_CREDITS_PREDICATE),
+            postgresql_where=text(_NEEDS_CREDITS_PREDICATE),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False, index=True)
     artist = Column(String(500), nullable=False, index=True)
     album = Column(String(500), nullable=False)
-    format = Column(String(100), nullable=False, index=True)  # Dolby Atmos
+    format = Column(String(100), nullable=False)  # Dolby Atmos
     platform = Column(String(100), nullable=False, index=True)  # Apple Music
     release_date = Column(DateTime, nullable=False, index=True)  # Original song release date
     atmos_release_date = Column(DateTime, nullable=True, index=True)  # When Atmos mix was released
@@ -96,17 +162,118 @@ class Track(Base):
     apple_music_id = Column(String(200), nullable=True, unique=True)  # Apple Music track ID
     discovered_at = Column(DateTime, default=datetime.now)  # When we first detected this track
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
-    extra_metadata = Column(Text, nullable=True)  # JSON field for additional metadata
+    # Additional metadata; serialized by the engine's json_serializer (orjson). Existing
+    # databases keep their TEXT column, which holds the same JSON documents
+    extra_metadata = Column(JSON, nullable=True)
 
     # New fields for Phase 1
     hall_of_shame = Column(Boolean, default=False)
     avg_immersiveness = Column(Float, nullable=True)  # Cached average
     review_summary = Column(Text, nullable=True)  # Editorial notes
+    credits_fetched_at = Column(DateTime, nullable=True)  # Last credits scrape attempt
+    last_atmos_check_at = Column(DateTime, nullable=True)  # Last silent upgrade check
 
-    # Relationships
-    credits = relationship("TrackCredit", back_populates="track", cascade="all, delete-orphan")
-    region_availability = relationship("RegionAvailability", back_populates="track", cascade="all, delete-orphan")
-    ratings = relationship("CommunityRating", back_populates="track", cascade="all, delete-orphan")
+    # Relationships (lazy="raise": callers load them explicitly with selectinload,
+    # so a missing option fails loudly instead of issuing one query per track)
+    credits = relationship(
+        "TrackCredit", back_populates="track", cascade="all, delete-orphan", lazy="raise"
+    )
+    region_availability = relationship(
+        "RegionAvailability", back_populates="track", cascade="all, delete-orphan", lazy="raise"
+    )
+    ratings = relationship(
+        "CommunityRating", back_populates="track", cascade="all, delete-orphan", lazy="raise"
+    )
 
     def __repr__(self):
         return f"<Track(title='{self.title}', artist='{self.artist}', format='{self.format}')>"
+
+
+# Match the /api/tracks ORDER BY (newest Atmos release first, id as tiebreaker) so
+# each keyset page is read straight off the index instead of sorting the table.
+# PostgreSQL sorts NULLs first on DESC, so it needs NULLS LAST spelled out;
+# SQLite already sorts NULLs last on DESC and rejects NULLS LAST in an index.
+_LISTING_ATMOS_ORDER = {
+    "postgresql": Track.atmos_release_date.desc().nullslast(),
+    "sqlite": Track.atmos_release_date.desc(),
+}
+for _dialect, _atmos_order in _LISTING_ATMOS_ORDER.items():
+    Index(
+        "ix_tracks_listing_order",
+        _atmos_order, Track.release_date.desc(), Track.id.desc(),
+    ).ddl_if(dialect=_dialect)
+    Index(
+        "ix_tracks_platform_format_listing_order",
+        Track.platform, Track.format, _atmos_order, Track.release_date.desc(), Track.id.desc(),
+    ).ddl_if(dialect=_dialect)
+
+
+# Keep tracks.avg_immersiveness / hall_of_shame in sync with community_ratings
+# inside the rating's own write transaction, so rate_track doesn't aggregate and
+# UPDATE from the API. Hall of shame: >30% fake reports with >5 votes; once set it
+# stays set. updated_at is bumped (local time, like the ORM default) so the
+# /api/tracks ETags change with the average.
+_SQLITE_RATING_AGGREGATE_UPDATE = """
+    UPDATE tracks SET
+        avg_immersiveness = (
+            SELECT avg(immersiveness_score) FROM community_ratings WHERE track_id = {row}.track_id
+        ),
+        hall_of_shame = CASE
+            WHEN (SELECT count(*) FROM community_ratings WHERE track_id = {row}.track_id) > 5
+             AND (SELECT avg(CASE WHEN is_fake_atmos THEN 1.0 ELSE 0.0 END)
+                  FROM community_ratings WHERE track_id = {row}.track_id) > 0.3
+            THEN 1 ELSE hall_of_shame END,
+        updated_at = datetime('now', 'localtime')
+    WHERE id = {row}.track_id;
+"""
+
+RATING_AGGREGATE_TRIGGER_DDL = {
+    "sqlite": [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_community_ratings_aggregate_{event_name.lower()}
+        AFTER {event_name} ON community_ratings
+        BEGIN
+        {_SQLITE_RATING_AGGREGATE_UPDATE.format(row=row)}
+        END
+        """
+        for event_name, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ],
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION refresh_track_rating_aggregate() RETURNS trigger AS $$
+        DECLARE
+            target_id integer := COALESCE(NEW.track_id, OLD.track_id);
+        BEGIN
+            UPDATE tracks SET
+                avg_immersiveness = agg.avg_score,
+                hall_of_shame = CASE
+                    WHEN agg.total > 5 AND agg.fake_ratio > 0.3 THEN TRUE
+                    ELSE tracks.hall_of_shame END,
+                updated_at = LOCALTIMESTAMP
+            FROM (
+                SELECT avg(immersiveness_score) AS avg_score,
+                       avg(CASE WHEN is_fake_atmos THEN 1.0 ELSE 0.0 END) AS fake_ratio,
+                       count(*) AS total
+                FROM community_ratings WHERE track_id = target_id
+            ) AS agg
+            WHERE tracks.id = target_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_community_ratings_aggregate ON community_ratings",
+        """
+        CREATE TRIGGER trg_community_ratings_aggregate
+        AFTER INSERT OR UPDATE OR DELETE ON community_ratings
+        FOR EACH ROW EXECUTE FUNCTION refresh_track_rating_aggregate()
+        """,
+    ],
+}
+
+# New databases get the trigger from create_all; run_migrations adds it to existing ones
+for _dialect, _statements in RATING_AGGREGATE_TRIGGER_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            CommunityRating.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect)
+        )
+
@@ -4,17 +4,39 @@ Background job scheduler for periodic spatial audio detection.
 Uses APScheduler to run periodic jobs that check for new spatial audio releases.
 Runs every 48 hours as recommended in the research.
 """
-import json
+import asyncio
 import logging
-from datetime import datetime
-
-from apscheduler.schedulers.background import BackgroundScheduler
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import (
+    JSON,
+    Text,
+    and_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from backend.apple_music_client import AppleMusicClient
-from backend.database import SessionLocal
-from backend.models import Engineer, RegionAvailability, Track, TrackCredit
+from backend.database import SessionLocal, engine
+from backend.models import Engineer, EngineerMixCount, RegionAvailability, Track, TrackCredit
 from backend.schemas import RefreshResponse
 from backend.utils.credits_scraper import CreditsScraper
 
@@ -23,10 +45,44 @@ logger = logging.getLogger(__name__)
 # Global scheduler instance
 scheduler = None
 
+# Rows per INSERT ... ON CONFLICT statement (stays well under SQLite's bound-parameter limit)
+UPSERT_BATCH_SIZE = 500
+
+# (title, artist) pairs per IN lookup (2 parameters each, under SQLite's default 999 limit)
+LOOKUP_BATCH_SIZE = 450
+
+# Catalog lookups in flight at once during the silent upgrade check
+SILENT_UPGRADE_CONCURRENCY = 8
+
+# Song IDs per catalog request (the Apple Music API accepts up to 300)
+CATALOG_LOOKUP_BATCH_SIZE = 300
+
+# (release age up to, recheck interval) for the silent upgrade check, newest first:
+# recent releases are upgraded far more often than back catalog. Intervals are a
+# day short of whole weeks so the weekly job doesn't skip a due track by minutes
+SILENT_UPGRADE_RECHECK_TIERS = (
+    (timedelta(days=365), timedelta(days=6)),
+    (timedelta(days=5 * 365), timedelta(days=29)),
+    (None, timedelta(days=89)),
+)
+
+# Tracks checked per silent upgrade run (10 catalog requests)
+SILENT_UPGRADE_MAX_TRACKS = 3000
+
+# Columns refreshed when a discovered track already exists
+_SYNC_UPDATE_COLUMNS = (
+    "title", "artist", "album", "format", "release_date", "atmos_release_date",
+    "music_link", "extra_metadata", "updated_at",
+)
+
 
 def start_scheduler():
     """
     Start the background scheduler for periodic spatial audio detection.
+
+    Must be called from the running event loop (the FastAPI startup hook): the
+    scheduler wakes up on that loop, awaits async jobs there and hands plain
+    functions to the loop's default thread pool.
     """
     global scheduler
 
@@ -34,21 +90,28 @@ def start_scheduler():
         logger.warning("Scheduler already running")
         return
 
-    scheduler = BackgroundScheduler()
+    # Overlapping runs of the same job are skipped and missed runs collapse into one,
+    # instead of queueing up behind a slow scan
+    scheduler = AsyncIOScheduler(job_defaults={"coalesce": True, "max_instances": 1})
+    now = datetime.now()
 
-    # Schedule spatial audio detection every 48 hours
+    # Schedule spatial audio detection every 48 hours. The first run stays a full
+    # interval out (a comprehensive scan on every restart would burn API quota);
+    # jitter keeps instances restarted together from scanning in lockstep
     scheduler.add_job(
         func=scheduled_spatial_audio_scan,
-        trigger=IntervalTrigger(hours=48),
+        trigger=IntervalTrigger(hours=48, jitter=3600),
         id='spatial_audio_scan',
         name='Scan for new spatial audio releases',
         replace_existing=True
     )
 
-    # Schedule silent upgrade check (Weekly)
+    # Schedule silent upgrade check (Weekly); only due tracks are checked, so an
+    # early first run after startup is cheap
     scheduler.add_job(
         func=scheduled_silent_upgrade_check,
-        trigger=IntervalTrigger(days=7),
+        trigger=IntervalTrigger(days=7, jitter=600),
+        next_run_time=now + timedelta(minutes=5),
         id='silent_upgrade_check',
         name='Check for silent Dolby Atmos upgrades',
         replace_existing=True
@@ -57,17 +120,33 @@ def start_scheduler():
     # Schedule credits fetching (Slow drip: every 5 minutes process a batch)
     scheduler.add_job(
         func=scheduled_credits_fetch,
-        trigger=IntervalTrigger(minutes=5),
+        trigger=IntervalTrigger(minutes=5, jitter=60),
+        next_run_time=now + timedelta(minutes=1),
         id='credits_fetch',
         name='Fetch deep metadata credits',
         replace_existing=True
     )
 
+    # Rebuild precomputed engineer mix counts once at startup
+    scheduler.add_job(
+        func=scheduled_engineer_mix_counts_refresh,
+        id='engineer_mix_counts_refresh',
+        name='Rebuild engineer mix counts',
+        replace_existing=True
+    )
+
+    scheduler.add_listener(_log_pool_status, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
     # Start the scheduler
     scheduler.start()
     logger.info("Background scheduler started - scanning every 48 hours")
 
 
+def _log_pool_status(event):
+    """Log connection pool usage after each job so leaked sessions show up in the logs."""
+    logger.debug(f"Job {event.job_id} finished; connection pool: {engine.pool.status()}")
+
+
 def stop_scheduler():
     """Stop the background scheduler."""
     global scheduler
@@ -78,7 +157,7 @@ def stop_scheduler():
         logger.info("Background scheduler stopped")
 
 
-def scheduled_spatial_audio_scan():
+async def scheduled_spatial_audio_scan():
     """
     Scheduled job to scan for new spatial audio releases.
     This runs every 48 hours automatically.
@@ -87,7 +166,8 @@ def scheduled_spatial_audio_scan():
 
     db = SessionLocal()
     try:
-        result = sync_spatial_audio_tracks(db)
+        # Same path as the manual refresh: the sync is blocking, keep it off the loop
+        result = await asyncio.to_thread(sync_spatial_audio_tracks, db)
         logger.info(f"Scheduled scan complete: {result['tracks_added']} added, {result['tracks_updated']} updated")
     except Exception as e:
         logger.error(f"Error during scheduled scan: {e}", exc_info=True)
@@ -96,43 +176,114 @@ def scheduled_spatial_audio_scan():
         db.close()
 
 
-def scheduled_silent_upgrade_check():
+def _silent_upgrade_due_filter(now: datetime):
+    """
+    Tracks due for another silent-upgrade check: never checked, or last checked
+    longer ago than the recheck interval for their release age.
+    """
+    tiers = []
+    newer_than = None
+    for max_age, interval in SILENT_UPGRADE_RECHECK_TIERS:
+        conditions = [Track.last_atmos_check_at <= now - interval]
+        if max_age is not None:
+            conditions.append(Track.release_date >= now - max_age)
+        if newer_than is not None:
+            conditions.append(Track.release_date < newer_than)
+        tiers.append(and_(*conditions))
+        newer_than = now - max_age if max_age is not None else None
+    return or_(Track.last_atmos_check_at.is_(None), *tiers)
+
+
+async def scheduled_silent_upgrade_check():
     """
     Weekly job to check for silent upgrades (tracks becoming Atmos later).
+
+    Older releases are rechecked less often (SILENT_UPGRADE_RECHECK_TIERS), and at
+    most SILENT_UPGRADE_MAX_TRACKS are checked per run, least recently checked first.
+    Tracks are looked up CATALOG_LOOKUP_BATCH_SIZE IDs per catalog request, with
+    up to SILENT_UPGRADE_CONCURRENCY requests in flight (in worker threads).
     """
     logger.info("Starting silent upgrade check...")
     db = SessionLocal()
     try:
-        # Find tracks that are NOT currently Atmos
-        potential_upgrades = db.query(Track).filter(Track.format != "Dolby Atmos").all()
+        now = datetime.now()
+
+        # Find tracks that are NOT currently Atmos and are due for a check
+        potential_upgrades = await asyncio.to_thread(
+            db.query(Track.id, Track.apple_music_id, Track.title, Track.artist).filter(
+                Track.format != "Dolby Atmos",
+                Track.apple_music_id.isnot(None),
+                _silent_upgrade_due_filter(now),
+            ).order_by(
+                Track.last_atmos_check_at.asc().nullsfirst()
+            ).limit(SILENT_UPGRADE_MAX_TRACKS).all
+        )
         logger.info(f"Checking {len(potential_upgrades)} tracks for silent upgrades")
 
         apple_client = AppleMusicClient()
-        upgraded_count = 0
-
-        for track in potential_upgrades:
-            if not track.apple_music_id:
-                continue
-
-            try:
-                # Re-fetch track info
-                tracks = apple_client.get_catalog_tracks(storefront="us", ids=[track.apple_music_id])
-                if not tracks:
+        semaphore = asyncio.Semaphore(SILENT_UPGRADE_CONCURRENCY)
+
+        async def find_dolby_atmos(ids: List[str]) -> Optional[Dict[str, bool]]:
+            """
+            Whether each requested ID is Atmos, or None if the lookup failed (ids
+            stay due and are retried on the next run). IDs a successful lookup
+            leaves out (delisted or not in this storefront) count as not Atmos.
+            """
+            async with semaphore:
+                try:
+                    tracks = await asyncio.to_thread(
+                        apple_client.get_catalog_tracks, storefront="us", ids=ids
+                    )
+                    if tracks is None:
+                        logger.error(f"Catalog lookup failed for {len(ids)} tracks")
+                        return None
+                    found = dict.fromkeys(ids, False)
+                    for track_data in tracks:
+                        support = apple_client.check_spatial_audio_support(track_data)
+                        found[track_data.get("id")] = support["has_dolby_atmos"]
+                    return found
+                except Exception as e:
+                    logger.error(f"Error checking upgrades for {len(ids)} tracks: {e}")
+                    return None
+
+        all_ids = [track.apple_music_id for track in potential_upgrades]
+        batches = [
+            all_ids[start:start + CATALOG_LOOKUP_BATCH_SIZE]
+            for start in range(0, len(all_ids), CATALOG_LOOKUP_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(find_dolby_atmos(batch) for batch in batches))
+
+        def record_results():
+            atmos_ids = set()
+            checked_ids = []
+            for found in results:
+                if found is None:
                     continue
+                checked_ids.extend(found)
+                atmos_ids.update(track_id for track_id, is_atmos in found.items() if is_atmos)
+            if checked_ids:
+                # Every ID of a successful lookup counts as checked, so tracks the
+                # catalog no longer returns don't stay first in line; updated_at is
+                # kept since the track data didn't change
+                db.execute(
+                    update(Track)
+                    .where(Track.apple_music_id.in_(checked_ids))
+                    .values(last_atmos_check_at=now, updated_at=Track.updated_at)
+                )
 
-                track_data = tracks[0]
-                spatial_info = apple_client.check_spatial_audio_support(track_data)
-
-                if spatial_info["has_dolby_atmos"]:
-                    logger.info(f"SILENT UPGRADE DETECTED: {track.title} by {track.artist}")
-                    track.format = "Dolby Atmos"
-                    track.atmos_release_date = datetime.now()
-                    track.updated_at = datetime.now()
-                    upgraded_count += 1
-            except Exception as e:
-                logger.error(f"Error checking upgrade for {track.title}: {e}")
+            upgraded = [track for track in potential_upgrades if track.apple_music_id in atmos_ids]
+            for track in upgraded:
+                logger.info(f"SILENT UPGRADE DETECTED: {track.title} by {track.artist}")
+            if upgraded:
+                db.execute(
+                    update(Track)
+                    .where(Track.id.in_([track.id for track in upgraded]))
+                    .values(format="Dolby Atmos", atmos_release_date=now, updated_at=now)
+                )
+            db.commit()
+            return len(upgraded)
 
-        db.commit()
+        upgraded_count = await asyncio.to_thread(record_results)
         logger.info(f"Silent upgrade check complete: {upgraded_count} tracks upgraded")
 
     except Exception as e:
@@ -141,28 +292,30 @@ def scheduled_silent_upgrade_check():
         db.close()
 
 
-def scheduled_credits_fetch():
+async def scheduled_credits_fetch():
     """
     Background job to fetch credits for tracks.
     Runs frequently but processes few tracks to respect rate limits.
+
+    Runs on the event loop: the scraper's rate-limit pauses are asyncio sleeps, so
+    they don't hold a worker thread; database work runs in a worker thread.
     """
     logger.info("Starting credits fetch job...")
     db = SessionLocal()
     scraper = CreditsScraper()
 
     try:
-        # Find Atmos tracks that don't have credits yet
-        # (This is a simplified check, ideally specific to 'has processed credits')
-        # We can use a joining query or just check if credits relationship is empty
-        # For efficiency, let's pick 5 random Atmos tracks without credits
-
-        # Subquery to find tracks with credits
-        # This might be slow on large DBs, but fine for now
-        tracks_needing_credits = db.query(Track).outerjoin(TrackCredit).filter(
-            Track.format == "Dolby Atmos",
-            TrackCredit.id == None,
-            Track.music_link != None
-        ).limit(5).all()
+        # Atmos tracks never scraped that have no credits yet (served by the
+        # ix_tracks_needing_credits partial index)
+        has_credits = exists().where(TrackCredit.track_id == Track.id)
+        tracks_needing_credits = await asyncio.to_thread(
+            db.query(Track.id, Track.title, Track.music_link).filter(
+                Track.format == "Dolby Atmos",
+                Track.music_link.isnot(None),
+                Track.credits_fetched_at.is_(None),
+                ~has_credits,
+            ).limit(5).all
+        )
 
         if not tracks_needing_credits:
             logger.debug("No tracks found needing credits")
@@ -170,51 +323,131 @@ def scheduled_credits_fetch():
 
         logger.info(f"Fetching credits for {len(tracks_needing_credits)} tracks")
 
-        for track in tracks_needing_credits:
-            if not track.music_link:
+        # Scrape first (requests spaced by the scraper's rate limit), then write
+        # everything in one batch and one commit
+        results = await scraper.fetch_many([track.music_link for track in tracks_needing_credits])
+        fetched_credits = []
+        scraped_ids = []
+        for track, credits_data in zip(tracks_needing_credits, results, strict=True):
+            if credits_data is None:
+                # Request failed: leave the track unmarked so the next poll retries it
                 continue
-
-            credits_data = scraper.fetch_credits(track.music_link)
-
+            scraped_ids.append(track.id)
             if credits_data:
-                for credit in credits_data:
-                    # Find or create Engineer
-                    engineer = db.query(Engineer).filter(Engineer.name == credit['name']).first()
-                    if not engineer:
-                        engineer = Engineer(
-                            name=credit['name'],
-                            slug=credit['slug']
-                        )
-                        db.add(engineer)
-                        db.flush() # get ID
-
-                    # Create Credit linking
-                    existing_credit = db.query(TrackCredit).filter(
-                        TrackCredit.track_id == track.id,
-                        TrackCredit.engineer_id == engineer.id,
-                        TrackCredit.role == credit['role']
-                    ).first()
-
-                    if not existing_credit:
-                        new_credit = TrackCredit(
-                            track_id=track.id,
-                            engineer_id=engineer.id,
-                            role=credit['role']
-                        )
-                        db.add(new_credit)
+                fetched_credits.append((track.id, credits_data))
+                logger.info(f"Fetched {len(credits_data)} credits for {track.title}")
+
+        def save_credits():
+            added = 0
+            if fetched_credits:
+                added = _save_track_credits(db, fetched_credits)
+                logger.info(f"Added {added} credits for {len(fetched_credits)} tracks")
+
+            # Mark completed scrapes so tracks without published credits drop out of
+            # the poll; updated_at is kept since the track data itself didn't change
+            if scraped_ids:
+                db.execute(
+                    update(Track)
+                    .where(Track.id.in_(scraped_ids))
+                    .values(credits_fetched_at=datetime.now(), updated_at=Track.updated_at)
+                )
+            db.commit()
 
-                logger.info(f"Added {len(credits_data)} credits for {track.title}")
+            # Counts only change when credits were added
+            if added:
+                refresh_engineer_mix_counts(db)
 
-            # Commit per track to save progress
-            db.commit()
+        await asyncio.to_thread(save_credits)
 
     except Exception as e:
         logger.error(f"Error during credits fetch job: {e}")
         db.rollback()
+    finally:
+        await scraper.aclose()
+        db.close()
+
+
+def _save_track_credits(db: Session, fetched_credits: List[Tuple[int, List[dict]]]) -> int:
+    """
+    Insert scraped credits, creating missing engineers, with a fixed number of
+    statements per batch instead of two lookups per credit. Does not commit.
+
+    Args:
+        db: Database session
+        fetched_credits: (track_id, credits) pairs from CreditsScraper.fetch_credits
+
+    Returns:
+        Number of credits inserted
+    """
+    slugs = {}
+    for _, credits_data in fetched_credits:
+        for credit in credits_data:
+            slugs.setdefault(credit['name'], credit['slug'])
+
+    engineer_ids = dict(db.execute(
+        select(Engineer.name, Engineer.id).where(Engineer.name.in_(list(slugs)))
+    ).all())
+    missing = [
+        {"name": name, "slug": slug}
+        for name, slug in slugs.items()
+        if name not in engineer_ids
+    ]
+    if missing:
+        engineer_ids.update(db.execute(
+            insert(Engineer).returning(Engineer.name, Engineer.id), missing
+        ).all())
+
+    seen = set(db.execute(
+        select(TrackCredit.track_id, TrackCredit.engineer_id, TrackCredit.role).where(
+            TrackCredit.track_id.in_([track_id for track_id, _ in fetched_credits])
+        )
+    ).all())
+    new_credits = []
+    for track_id, credits_data in fetched_credits:
+        for credit in credits_data:
+            key = (track_id, engineer_ids[credit['name']], credit['role'])
+            if key not in seen:
+                seen.add(key)
+                new_credits.append({"track_id": key[0], "engineer_id": key[1], "role": key[2]})
+
+    if new_credits:
+        db.execute(insert(TrackCredit), new_credits)
+    return len(new_credits)
+
+
+def scheduled_engineer_mix_counts_refresh():
+    """
+    Job wrapper to rebuild engineer mix counts with its own session.
+    """
+    db = SessionLocal()
+    try:
+        refresh_engineer_mix_counts(db)
+    except Exception as e:
+        logger.error(f"Error rebuilding engineer mix counts: {e}")
+        db.rollback()
     finally:
         db.close()
 
 
+def refresh_engineer_mix_counts(db: Session):
+    """
+    Rebuild the precomputed engineer_mix_counts table from track_credits.
+    Keeps the mix-count aggregation off the /api/engineers read path.
+
+    Args:
+        db: Database session
+    """
+    db.query(EngineerMixCount).delete(synchronize_session=False)
+    db.execute(
+        insert(EngineerMixCount).from_select(
+            ["engineer_id", "mix_count"],
+            select(TrackCredit.engineer_id, func.count(TrackCredit.id))
+            .group_by(TrackCredit.engineer_id)
+        )
+    )
+    db.commit()
+
+
 async def trigger_manual_refresh(db: Session) -> RefreshResponse:
     """
     Manually trigger a refresh of spatial audio data.
@@ -226,7 +459,8 @@ async def trigger_manual_refresh(db: Session) -> RefreshResponse:
         Refresh response with statistics
     """
     logger.info("Manual refresh triggered")
-    result = sync_spatial_audio_tracks(db)
+    # The sync is blocking (HTTP + sync DB session); keep it off the event loop
+    result = await asyncio.to_thread(sync_spatial_audio_tracks, db)
 
     return RefreshResponse(
         status="success",
@@ -237,10 +471,213 @@ async def trigger_manual_refresh(db: Session) -> RefreshResponse:
     )
 
 
+def _iter_in_background(iterable: Iterable, max_pending: int = 4) -> Iterator:
+    """
+    Consume `iterable` in a worker thread and yield its items as they arrive.
+
+    Lets network-bound discovery fetch the next source while the caller writes
+    the previous batch to the database. Exceptions from the worker are re-raised
+    here; if the caller stops early the worker is told to stop and drained.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                pending.put((item, None))
+        except Exception as e:
+            pending.put((None, e))
+        finally:
+            pending.put((done, None))
+
+    worker = threading.Thread(target=produce, name="spatial-audio-discovery", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = pending.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        while worker.is_alive():
+            try:
+                pending.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _build_track_rows(
+    discovered_tracks: List[dict], now: datetime
+) -> Tuple[Dict[str, dict], Dict[str, list]]:
+    """
+    Turn discovered tracks into upsert rows and region availability, keyed by Apple Music ID.
+
+    One row per ID: duplicates would make ON CONFLICT touch the same row twice
+    in a single statement. Malformed entries are logged and skipped.
+    """
+    rows = {}
+    regions = {}
+    for track_data in discovered_tracks:
+        try:
+            apple_music_id = track_data["apple_music_id"]
+            rows[apple_music_id] = {
+                "title": track_data["title"],
+                "artist": track_data["artist"],
+                "album": track_data["album"],
+                "format": track_data["format"],
+                "platform": track_data["platform"],
+                "release_date": track_data["release_date"],
+                "atmos_release_date": track_data.get("atmos_release_date"),
+                "album_art": track_data.get("album_art", "🎵"),
+                "music_link": track_data.get("music_link"),
+                "apple_music_id": apple_music_id,
+                "extra_metadata": track_data.get("metadata", {}),
+                "discovered_at": now,
+                "updated_at": now,
+            }
+            if "region_availability" in track_data:
+                regions[apple_music_id] = track_data["region_availability"]
+        except Exception as e:
+            logger.error(f"Error processing track {track_data.get('title', 'Unknown')}: {e}")
+            continue
+    return rows, regions
+
+
+def _comparable(column):
+    """PostgreSQL's json type has no equality operator; compare its text form."""
+    return cast(column, Text) if isinstance(column.type, JSON) else column
+
+
+def _sync_region_availability(db: Session, track_regions: Dict[int, list], dialect_insert) -> None:
+    """
+    Bring region_availability in line with the reported regions of each track,
+    touching only rows that changed: new or changed storefronts are upserted on
+    (track_id, storefront), storefronts no longer reported are deleted.
+    """
+    if not track_regions:
+        return
+
+    wanted = {
+        (track_id, region_data["storefront"]): (region_data["is_available"], region_data["format"])
+        for track_id, region_list in track_regions.items()
+        for region_data in region_list
+    }
+    current = {
+        (track_id, storefront): (is_available, region_format)
+        for track_id, storefront, is_available, region_format in db.execute(
+            select(
+                RegionAvailability.track_id, RegionAvailability.storefront,
+                RegionAvailability.is_available, RegionAvailability.format,
+            ).where(RegionAvailability.track_id.in_(list(track_regions)))
+        )
+    }
+
+    removed = [key for key in current if key not in wanted]
+    if removed:
+        db.execute(delete(RegionAvailability).where(
+            tuple_(RegionAvailability.track_id, RegionAvailability.storefront).in_(removed)
+        ))
+
+    changed = [
+        {
+            "track_id": track_id,
+            "storefront": storefront,
+            "is_available": is_available,
+            "format": region_format,
+        }
+        for (track_id, storefront), (is_available, region_format) in wanted.items()
+        if current.get((track_id, storefront)) != (is_available, region_format)
+    ]
+    if changed:
+        stmt = dialect_insert(RegionAvailability).values(changed)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[RegionAvailability.track_id, RegionAvailability.storefront],
+            set_={"is_available": stmt.excluded.is_available, "format": stmt.excluded.format},
+        ))
+
+
+def _upsert_track_rows(
+    db: Session, batch: List[dict], regions: Dict[str, list], dialect_insert
+) -> Tuple[int, int]:
+    """
+    Upsert one batch of track rows with a single INSERT ... ON CONFLICT and
+    apply the region availability changes for the tracks that reported it.
+
+    Existing tracks whose synced columns are all unchanged are left untouched
+    (no row write, updated_at kept), so a routine rescan writes almost nothing.
+
+    Returns:
+        (tracks_added, tracks_updated)
+    """
+    stmt = dialect_insert(Track).values(batch)
+    synced_columns = [column for column in _SYNC_UPDATE_COLUMNS if column != "updated_at"]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Track.apple_music_id],
+        set_={column: stmt.excluded[column] for column in _SYNC_UPDATE_COLUMNS},
+        where=or_(*(
+            _comparable(Track.__table__.c[column]).is_distinct_from(_comparable(stmt.excluded[column]))
+            for column in synced_columns
+        )),
+    ).returning(Track.id, Track.apple_music_id)
+
+    # Rows skipped by the WHERE above aren't returned
+    if dialect_insert is pg_insert:
+        # xmax is 0 only on freshly inserted tuples, so the upsert itself
+        # reports insert vs update without a separate existence lookup
+        stmt = stmt.returning(literal_column("(xmax = 0)").label("was_insert"))
+        results = db.execute(stmt).all()
+        track_ids = {row.apple_music_id: row.id for row in results}
+        tracks_added = sum(1 for row in results if row.was_insert)
+        tracks_updated = len(results) - tracks_added
+        unchanged_with_regions = [
+            row["apple_music_id"] for row in batch
+            if row["apple_music_id"] in regions and row["apple_music_id"] not in track_ids
+        ]
+        if unchanged_with_regions:
+            track_ids.update(db.execute(
+                select(Track.apple_music_id, Track.id)
+                .where(Track.apple_music_id.in_(unchanged_with_regions))
+            ).all())
+    else:
+        # SQLite has no equivalent: look up which ids already exist first
+        existing = dict(db.execute(
+            select(Track.apple_music_id, Track.id).where(
+                Track.apple_music_id.in_([row["apple_music_id"] for row in batch])
+            )
+        ).all())
+        written = dict(db.execute(stmt).all())
+        tracks_added = len(batch) - len(existing)
+        tracks_updated = len(written) - tracks_added
+        track_ids = {
+            **existing,
+            **{apple_music_id: track_id for track_id, apple_music_id in written.items()},
+        }
+
+    _sync_region_availability(db, {
+        track_ids[apple_music_id]: regions[apple_music_id]
+        for apple_music_id in track_ids
+        if apple_music_id in regions
+    }, dialect_insert)
+
+    return tracks_added, tracks_updated
+
+
 def sync_spatial_audio_tracks(db: Session, comprehensive: bool = True) -> dict:
     """
     Sync spatial audio tracks from Apple Music API to database.
 
+    Discovery runs source by source in a background thread while the tracks
+    from earlier sources are upserted, so network and database work overlap.
+    At most one source's tracks are held in memory at a time (plus the few
+    sources queued ahead by the background thread).
+
     Args:
         db: Database session
         comprehensive: If True, use all discovery sources (playlists, charts, albums, search).
@@ -258,85 +695,39 @@ def sync_spatial_audio_tracks(db: Session, comprehensive: bool = True) -> dict:
     # Discover spatial audio tracks from Apple Music
     if comprehensive:
         logger.info("Starting COMPREHENSIVE spatial audio discovery (all sources)...")
-        discovered_tracks = apple_client.discover_all_spatial_audio_tracks()
     else:
         logger.info("Discovering spatial audio tracks from curated playlists only...")
-        discovered_tracks = apple_client.discover_spatial_audio_tracks()
-
-    # Process each discovered track
-    for track_data in discovered_tracks:
-        try:
-            # Check if track already exists by Apple Music ID
-            track = db.query(Track).filter(
-                Track.apple_music_id == track_data["apple_music_id"]
-            ).first()
-
-            if track:
-                # Update existing track
-                track.title = track_data["title"]
-                track.artist = track_data["artist"]
-                track.album = track_data["album"]
-                track.format = track_data["format"]
-                track.release_date = track_data["release_date"]
-                track.atmos_release_date = track_data.get("atmos_release_date")
-                track.music_link = track_data.get("music_link")
-                track.extra_metadata = json.dumps(track_data.get("metadata", {}))
-                track.updated_at = datetime.now()
-                tracks_updated += 1
-                logger.debug(f"Updated track: {track_data['title']} by {track_data['artist']}")
-            else:
-                # Add new track
-                track = Track(
-                    title=track_data["title"],
-                    artist=track_data["artist"],
-                    album=track_data["album"],
-                    format=track_data["format"],
-                    platform=track_data["platform"],
-                    release_date=track_data["release_date"],
-                    atmos_release_date=track_data.get("atmos_release_date"),
-                    album_art=track_data.get("album_art", "🎵"),
-                    music_link=track_data.get("music_link"),
-                    apple_music_id=track_data.get("apple_music_id"),
-                    extra_metadata=json.dumps(track_data.get("metadata", {})),
-                    discovered_at=datetime.now()
-                )
-                db.add(track)
-                tracks_added += 1
-                logger.debug(f"Added new track: {track_data['title']} by {track_data['artist']}")
-
-            # Flush to get track ID for new tracks
-            db.flush()
-
-            # Process region availability if present
-            if "region_availability" in track_data:
-                # Clear existing availability
-                db.query(RegionAvailability).filter(
-                    RegionAvailability.track_id == track.id
-                ).delete()
-
-                # Add new availability records
-                for region_data in track_data["region_availability"]:
-                    avail = RegionAvailability(
-                        track_id=track.id,
-                        storefront=region_data["storefront"],
-                        is_available=region_data["is_available"],
-                        format=region_data["format"]
-                    )
-                    db.add(avail)
-
-        except Exception as e:
-            logger.error(f"Error processing track {track_data.get('title', 'Unknown')}: {e}")
-            continue
-
-    # Commit all changes
+    discovered_batches = apple_client.iter_spatial_audio_track_batches(comprehensive=comprehensive)
+
+    # Upsert in batches: one INSERT ... ON CONFLICT per batch (plus an existence
+    # lookup on SQLite to tell inserts from updates)
+    # (a single consumer: one session, and SQLite allows one writer anyway).
+    # Each batch is committed on its own, so the write transaction (and SQLite's
+    # database write lock, which blocks ratings) never spans the network-bound
+    # discovery of the next source; a failure keeps the batches already stored
+    now = datetime.now()
+    dialect_insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
     try:
-        db.commit()
-        logger.info(f"Database sync complete: {tracks_added} added, {tracks_updated} updated")
+        for discovered_tracks in _iter_in_background(discovered_batches):
+            rows, regions = _build_track_rows(discovered_tracks, now)
+            row_list = list(rows.values())
+            for start in range(0, len(row_list), UPSERT_BATCH_SIZE):
+                added, updated = _upsert_track_rows(
+                    db, row_list[start:start + UPSERT_BATCH_SIZE], regions, dialect_insert
+                )
+                db.commit()
+                tracks_added += added
+                tracks_updated += updated
     except Exception as e:
         db.rollback()
-        logger.error(f"Error committing changes to database: {e}")
+        logger.error(
+            f"Error upserting discovered tracks after {tracks_added} added, "
+            f"{tracks_updated} updated: {e}"
+        )
         raise
 
+    logger.info(f"Database sync complete: {tracks_added} added, {tracks_updated} updated")
+
     return {
         "tracks_added": tracks_added,
         "tracks_updated": tracks_updated
@@ -354,31 +745,48 @@ def import_existing_data_json(db: Session, data_json_path: str = "data.json"):
     """
 
     try:
-        with open(data_json_path, 'r') as f:
-            tracks_data = json.load(f)
+        with open(data_json_path, 'rb') as f:
+            tracks_data = orjson.loads(f.read())
+
+        # Prefetch which (title, artist) pairs already exist, a batch per query,
+        # instead of one lookup per track
+        pairs = list({(t["title"], t["artist"]) for t in tracks_data})
+        existing = set()
+        for start in range(0, len(pairs), LOOKUP_BATCH_SIZE):
+            existing.update(
+                db.execute(
+                    select(Track.title, Track.artist).where(
+                        tuple_(Track.title, Track.artist).in_(
+                            pairs[start:start + LOOKUP_BATCH_SIZE]
+                        )
+                    )
+                ).tuples()
+            )
 
+        now = datetime.now()
+        new_rows = []
         for track_data in tracks_data:
-            # Check if track already exists by title and artist
-            existing_track = db.query(Track).filter(
-                Track.title == track_data["title"],
-                Track.artist == track_data["artist"]
-            ).first()
-
-            if not existing_track:
-                new_track = Track(
-                    title=track_data["title"],
-                    artist=track_data["artist"],
-                    album=track_data["album"],
-                    format=track_data["format"],
-                    platform=track_data["platform"],
-                    release_date=datetime.fromisoformat(track_data["releaseDate"]),
-                    album_art=track_data.get("albumArt", "🎵"),
-                    discovered_at=datetime.now()
-                )
-                db.add(new_track)
+            key = (track_data["title"], track_data["artist"])
+            if key not in existing:
+                existing.add(key)
+                new_rows.append({
+                    "title": track_data["title"],
+                    "artist": track_data["artist"],
+                    "album": track_data["album"],
+                    "format": track_data["format"],
+                    "platform": track_data["platform"],
+                    "release_date": datetime.fromisoformat(track_data["releaseDate"]),
+                    "album_art": track_data.get("albumArt", "🎵"),
+                    "discovered_at": now,
+                    "updated_at": now,
+                })
+
+        # Core executemany in chunks instead of one ORM object per track
+        for start in range(0, len(new_rows), UPSERT_BATCH_SIZE):
+            db.execute(insert(Track), new_rows[start:start + UPSERT_BATCH_SIZE])
 
         db.commit()
-        logger.info(f"Imported {len(tracks_data)} tracks from data.json")
+        logger.info(f"Imported {len(new_rows)} of {len(tracks_data)} tracks from data.json")
 
     except Exception as e:
         db.rollback()
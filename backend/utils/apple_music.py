@@ -1,32 +1,105 @@
+import json
+import logging
 import os
+import tempfile
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import jwt
+from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePrivateKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+logger = logging.getLogger(__name__)
 
 # Token expiration: 180 days (maximum allowed by Apple Music API)
 TOKEN_EXPIRATION_DAYS = 180
+_SECONDS_PER_DAY = 86400
+TOKEN_LIFETIME_SECONDS = TOKEN_EXPIRATION_DAYS * _SECONDS_PER_DAY
+
+# Tokens are regenerated once they are within this many seconds of expiring
+TOKEN_REFRESH_BUFFER = 3600
+
+# Signed tokens are shared across processes (workers, reloads, scheduler restarts)
+# through this file, so each one doesn't re-read the key and re-sign on startup
+TOKEN_CACHE_PATH = Path(
+    os.getenv(
+        "APPLE_TOKEN_CACHE_PATH",
+        Path.home() / ".cache" / "spatial-selecta" / "apple_token.json",
+    )
+)
 
 # In-memory cache with expiration tracking
 _cached_token: Optional[str] = None
 _token_expires_at: float = 0
 
 
-def get_apple_music_token() -> str:
+@lru_cache(maxsize=4)
+def _load_signing_key(key_path: str, key_mtime: float) -> EllipticCurvePrivateKey:
+    """
+    Parse the .p8 key once per file version; jwt.encode would re-parse the PEM
+    on every signing. key_mtime is part of the cache key so a replaced key is reloaded.
+    """
+    with open(key_path, 'rb') as f:
+        return load_pem_private_key(f.read(), password=None)
+
+
+def _read_cached_token(
+    team_id: str, key_id: str, key_file: Path, current_time: float
+) -> Optional[dict]:
+    """Return the on-disk token entry if it was signed with this key and is still fresh."""
+    try:
+        with open(TOKEN_CACHE_PATH, 'r') as f:
+            entry = json.load(f)
+        if (
+            entry.get('team_id') == team_id
+            and entry.get('key_id') == key_id
+            and entry.get('key_mtime') == key_file.stat().st_mtime
+            and current_time < entry['exp'] - TOKEN_REFRESH_BUFFER
+        ):
+            return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_cached_token(entry: dict) -> None:
+    """Atomically replace the on-disk token cache (owner-only permissions)."""
+    try:
+        TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TOKEN_CACHE_PATH.parent, prefix='.apple_token.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write Apple Music token cache: {e}")
+
+
+def get_apple_music_token(force_refresh: bool = False) -> str:
     """
     Generate and cache Apple Music API developer token.
     Token lasts 180 days before needing regeneration.
-    
-    The token is cached in memory with expiration tracking. Tokens are regenerated
-    when they expire or when the process restarts.
+
+    The token is cached in memory and in TOKEN_CACHE_PATH, so new processes reuse
+    it instead of signing their own. A cached token is only reused while it was
+    signed with the current team ID, key ID and key file.
+
+    Args:
+        force_refresh: Sign a new token even if a cached one is still valid
     """
     global _cached_token, _token_expires_at
 
     current_time = time.time()
 
     # Return cached token if still valid (with 1 hour buffer before expiration)
-    if _cached_token and current_time < (_token_expires_at - 3600):
+    token_fresh = current_time < (_token_expires_at - TOKEN_REFRESH_BUFFER)
+    if not force_refresh and _cached_token and token_fresh:
         return _cached_token
 
     # Load credentials from environment variables
@@ -50,12 +123,19 @@ def get_apple_music_token() -> str:
     if not key_file.exists():
         raise FileNotFoundError(f"Private key file not found at {key_path}")
 
-    with open(key_file, 'r') as f:
-        private_key = f.read()
+    if not force_refresh:
+        entry = _read_cached_token(team_id, key_id, key_file, current_time)
+        if entry:
+            _cached_token = entry['token']
+            _token_expires_at = entry['exp']
+            return _cached_token
+
+    key_mtime = key_file.stat().st_mtime
+    private_key = _load_signing_key(str(key_file), key_mtime)
 
     # Create JWT token
     iat = int(current_time)
-    exp = iat + (TOKEN_EXPIRATION_DAYS * 24 * 60 * 60)
+    exp = iat + TOKEN_LIFETIME_SECONDS
 
     payload = {
         'iss': team_id,
@@ -73,5 +153,12 @@ def get_apple_music_token() -> str:
     # Cache the token
     _cached_token = token
     _token_expires_at = exp
+    _write_cached_token({
+        'token': token,
+        'exp': exp,
+        'team_id': team_id,
+        'key_id': key_id,
+        'key_mtime': key_mtime,
+    })
 
     return token
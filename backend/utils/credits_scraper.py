@@ -2,18 +2,118 @@
 Scraper for extracting deep metadata (credits) from Apple Music web pages.
 Implements the "Deep Mining" strategy described in the research.
 """
-import json
+import asyncio
+import hashlib
+import html
 import logging
+import os
 import random
 import re
+import tempfile
 import time
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
 import httpx
-from bs4 import BeautifulSoup
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
 
 logger = logging.getLogger(__name__)
 
+# libxml2-backed tree builder when lxml is installed; the pure-Python parser otherwise
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def _is_credit_element(name: str, attrs: dict) -> bool:
+    """Whether an element can match CreditsScraper.CREDIT_SELECTORS (class or data-testid)."""
+    classes = attrs.get('class') or ''
+    if not isinstance(classes, str):
+        classes = ' '.join(classes)
+    return (
+        'credit' in classes
+        or 'contributor' in classes
+        or 'credit' in (attrs.get('data-testid') or '')
+    )
+
+
+# Only credit elements (and their subtrees) are built into the BeautifulSoup tree
+_CREDIT_STRAINER = SoupStrainer(_is_credit_element)
+
+
+# Parsed credits are kept on disk per URL, so re-runs and restarts skip the
+# rate-limited request entirely while an entry is fresh. Pages that returned 404
+# are remembered (with no credits) for a shorter time. Entries also keep the
+# page's ETag/Last-Modified and body hash: once an entry expires the page is
+# revalidated, and a 304 or an identical body reuses the stored credits
+CREDITS_CACHE_DIR = Path(
+    os.getenv("CREDITS_CACHE_DIR", Path.home() / ".cache" / "spatial-selecta" / "credits")
+)
+CREDITS_CACHE_TTL = 7 * 86400  # seconds
+MISSING_PAGE_CACHE_TTL = 86400  # seconds
+
+
+def _stored_credits_path(track_url: str) -> Path:
+    key = hashlib.sha1(track_url.encode()).hexdigest()
+    return CREDITS_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _read_stored_entry(track_url: str) -> Optional[Dict]:
+    """The stored entry for this URL, fresh or not, or None if there is none."""
+    try:
+        entry = orjson.loads(_stored_credits_path(track_url).read_bytes())
+        if entry['url'] == track_url and isinstance(entry['credits'], list):
+            return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _is_fresh(entry: Dict) -> bool:
+    """Whether a stored entry can be used without contacting the server."""
+    ttl = MISSING_PAGE_CACHE_TTL if entry.get('missing') else CREDITS_CACHE_TTL
+    try:
+        return time.time() - entry['fetched_at'] < ttl
+    except (KeyError, TypeError):
+        return False
+
+
+def _store_credits(
+    track_url: str,
+    credits: List[Dict],
+    missing: bool = False,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    body_hash: Optional[str] = None,
+) -> None:
+    """Atomically write the stored credits entry (and page validators) for this URL."""
+    path = _stored_credits_path(track_url)
+    entry = {
+        'url': track_url,
+        'fetched_at': time.time(),
+        'missing': missing,
+        'credits': credits,
+        'etag': etag,
+        'last_modified': last_modified,
+        'body_hash': body_hash,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.credits.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(entry))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write credits cache for {track_url}: {e}")
+
+
 class CreditsScraper:
     """
     Scrapes Apple Music web pages to extract credits not available in the public API.
@@ -24,28 +124,143 @@ class CreditsScraper:
     # Rate limiting configuration
     MIN_DELAY = 5.0  # seconds
     MAX_DELAY = 10.0 # seconds
+    # Pages fetched at once by fetch_many; request starts stay rate limited, this
+    # only lets slow responses overlap
+    FETCH_CONCURRENCY = 4
+
+    # Roles we extract, most specific first so "Immersive Mix Engineer" wins over
+    # "Mix Engineer" and "Engineer" at the same position
+    TARGET_ROLES = (
+        "Immersive Mix Engineer", "Dolby Atmos Mixer", "Surround Mix Engineer",
+        "Mix Engineer", "Mastering Engineer", "Engineer", "Producer"
+    )
+    _ROLE_ALTERNATION = "|".join(re.escape(role) for role in TARGET_ROLES)
+    # One pass over the text for all roles; a name stops where the next role begins
+    ROLE_PATTERN = re.compile(
+        f"(?P<role>{_ROLE_ALTERNATION})\\s*[:|-]?\\s*"
+        f"(?P<name>[A-Z](?:(?!{_ROLE_ALTERNATION})[a-zA-Z0-9\\s\\.])+)",
+        re.IGNORECASE
+    )
+    _ROLE_NAMES = {role.lower(): role for role in TARGET_ROLES}
+    _SLUG_TABLE = str.maketrans({" ": "-", ".": None})
+    # Every target role contains one of these; substring checks rule out most
+    # text blocks far faster than running ROLE_PATTERN over them
+    ROLE_KEYWORDS = ("engineer", "mixer", "producer")
+
+    # Cheap text-level stand-ins for the DOM, which is only built for the CSS selectors
+    JSON_SCRIPT_PATTERN = re.compile(
+        r"""<script\b[^>]*\btype\s*=\s*["']application/json["'][^>]*>(.*?)</script\s*>""",
+        re.IGNORECASE | re.DOTALL
+    )
+    # Elements whose content is not page text (matches what soup.get_text() skips)
+    NON_TEXT_PATTERN = re.compile(
+        r"<(script|style|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->",
+        re.IGNORECASE | re.DOTALL
+    )
+    TAG_PATTERN = re.compile(r"<[^>]+>")
+
+    # Common selectors for credits sections
+    CREDIT_SELECTORS = (
+        '[class*="credit"]',
+        '[class*="contributor"]',
+        '[data-testid*="credit"]',
+        '.credits',
+        '.contributors'
+    )
 
     def __init__(self):
         self.last_request_time = 0
+        self._rate_limit_lock = asyncio.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
         }
 
+    def _rate_limit_delay(self) -> float:
+        """Seconds to wait before the next request (0 if enough time has passed)."""
+        elapsed = time.time() - self.last_request_time
+        if elapsed < self.MIN_DELAY:
+            return self.MIN_DELAY - elapsed + random.uniform(0, self.MAX_DELAY - self.MIN_DELAY)
+        return 0.0
+
     def _wait_for_rate_limit(self):
         """Enforce rate limiting to avoid IP bans."""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-
-        if elapsed < self.MIN_DELAY:
-            delay = self.MIN_DELAY - elapsed + random.uniform(0, self.MAX_DELAY - self.MIN_DELAY)
+        delay = self._rate_limit_delay()
+        if delay:
             logger.debug(f"Rate limiting: sleeping for {delay:.2f}s")
             time.sleep(delay)
 
         self.last_request_time = time.time()
 
-    def fetch_credits(self, track_url: str) -> List[Dict]:
+    async def _wait_for_rate_limit_async(self):
+        """
+        Async variant of _wait_for_rate_limit: waits without blocking the thread.
+        Concurrent callers queue on a lock, so request starts stay MIN_DELAY apart.
+        """
+        async with self._rate_limit_lock:
+            delay = self._rate_limit_delay()
+            if delay:
+                logger.debug(f"Rate limiting: sleeping for {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+            self.last_request_time = time.time()
+
+    def _request_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Request headers, with If-None-Match / If-Modified-Since from a stored entry."""
+        headers = dict(self.headers)
+        if entry:
+            if entry.get('etag'):
+                headers["If-None-Match"] = entry['etag']
+            if entry.get('last_modified'):
+                headers["If-Modified-Since"] = entry['last_modified']
+        return headers
+
+    def _unchanged_credits(
+        self, entry: Optional[Dict], response: httpx.Response
+    ) -> Optional[List[Dict]]:
+        """Stored credits if the response shows the page is unchanged, else None."""
+        if entry is None or entry.get('missing'):
+            return None
+        if response.status_code == 304:
+            logger.debug(f"Not modified: {entry['url']}")
+            return entry['credits']
+        if response.is_success and entry.get('body_hash') == self._body_hash(response):
+            return entry['credits']
+        return None
+
+    def _remember(
+        self,
+        track_url: str,
+        response: httpx.Response,
+        credits: List[Dict],
+        entry: Optional[Dict] = None,
+    ) -> None:
+        """Store credits with the response's validators (the stored ones after a 304)."""
+        if response.status_code == 304:
+            _store_credits(
+                track_url,
+                credits,
+                etag=response.headers.get("ETag") or entry.get('etag'),
+                last_modified=entry.get('last_modified'),
+                body_hash=entry.get('body_hash'),
+            )
+        else:
+            _store_credits(
+                track_url,
+                credits,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                body_hash=self._body_hash(response),
+            )
+
+    @staticmethod
+    def _body_hash(response: httpx.Response) -> str:
+        return hashlib.blake2b(response.content, digest_size=16).hexdigest()
+
+    def fetch_credits(self, track_url: str) -> Optional[List[Dict]]:
         """
         Fetch credits for a track from its Apple Music web URL.
         
@@ -53,24 +268,126 @@ class CreditsScraper:
             track_url: Full URL to the track page (e.g., https://music.apple.com/us/song/name/id)
             
         Returns:
-            List of credit dictionaries with 'name', 'role', and 'slug' (if available)
+            List of credit dictionaries with 'name', 'role', and 'slug' (if available);
+            empty if the page has none or doesn't exist (404). None if the request
+            failed (network error or other HTTP error status), so callers can retry
         """
+        entry = _read_stored_entry(track_url)
+        if entry is not None and _is_fresh(entry):
+            return entry['credits']
+
         self._wait_for_rate_limit()
 
         try:
             logger.info(f"Scraping credits from: {track_url}")
-            response = httpx.get(track_url, headers=self.headers, follow_redirects=True, timeout=10.0)
-            response.raise_for_status()
+            response = self._get_client().get(track_url, headers=self._request_headers(entry))
+            credits = self._unchanged_credits(entry, response)
+            if credits is None:
+                if response.status_code == 404:
+                    _store_credits(track_url, [], missing=True)
+                    return []
+                response.raise_for_status()
+                credits = self._parse_credits(response.text)
 
-            return self._parse_credits(response.text)
+            self._remember(track_url, response, credits, entry)
+            return credits
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error scraping {track_url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error scraping {track_url}: {e}")
             return []
+
+    async def fetch_credits_async(self, track_url: str) -> Optional[List[Dict]]:
+        """
+        Async variant of fetch_credits for callers on an event loop (same return values).
+        Parsing runs in a worker thread so it doesn't stall the loop.
+        """
+        entry = _read_stored_entry(track_url)
+        if entry is not None and _is_fresh(entry):
+            return entry['credits']
+
+        await self._wait_for_rate_limit_async()
+
+        try:
+            logger.info(f"Scraping credits from: {track_url}")
+            response = await self._get_async_client().get(
+                track_url, headers=self._request_headers(entry)
+            )
+            credits = self._unchanged_credits(entry, response)
+            if credits is None:
+                if response.status_code == 404:
+                    _store_credits(track_url, [], missing=True)
+                    return []
+                response.raise_for_status()
+                credits = await asyncio.to_thread(self._parse_credits, response.text)
+
+            self._remember(track_url, response, credits, entry)
+            return credits
+
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error scraping {track_url}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error scraping {track_url}: {e}")
             return []
 
+    async def fetch_many(
+        self, track_urls: List[str], concurrency: Optional[int] = None
+    ) -> List[Optional[List[Dict]]]:
+        """
+        Fetch credits for several tracks over the shared connection pool.
+
+        Returns:
+            One fetch_credits_async result per URL, in the same order
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.FETCH_CONCURRENCY)
+
+        async def fetch(track_url: str) -> Optional[List[Dict]]:
+            async with semaphore:
+                return await self.fetch_credits_async(track_url)
+
+        return await asyncio.gather(*(fetch(url) for url in track_urls))
+
+    def _get_client(self) -> httpx.Client:
+        """Client shared by this scraper's fetches, so connections are kept alive."""
+        if self._client is None:
+            self._client = httpx.Client(
+                follow_redirects=True,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=self.FETCH_CONCURRENCY),
+            )
+        return self._client
+
+    def close(self):
+        """Close the connection pool used by fetch_credits."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Client shared by this scraper's async fetches, so connections are kept alive."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=self.FETCH_CONCURRENCY),
+            )
+        return self._async_client
+
+    async def aclose(self):
+        """Close the async connection pool."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def _parse_credits(self, html_content: str) -> List[Dict]:
         """
         Parse HTML content to extract credit information.
@@ -78,62 +395,63 @@ class CreditsScraper:
         """
         credits = []
 
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-        except Exception as e:
-            logger.error(f"Error parsing HTML content: {e}")
-            return []
-
         # Strategy 1: Look for JSON data embedded in the page (most reliable)
-        # Often found in a script tag with ID dealing with "shoebox" or "server-data"
+        # Often found in a script tag with ID dealing with "shoebox" or "server-data".
+        # Only script bodies that mention credits are decoded, and pages that never
+        # mention them skip the script scan altogether
         try:
-            scripts = soup.find_all('script', type='application/json')
-            for script in scripts:
+            scripts = (
+                self.JSON_SCRIPT_PATTERN.finditer(html_content)
+                if '"credits"' in html_content
+                else ()
+            )
+            for match in scripts:
+                script = match.group(1)
+                if '"credits"' not in script:
+                    continue
                 try:
-                    data = json.loads(script.string)
+                    data = orjson.loads(script)
                     # Look for credits in nested JSON structure
                     # This is a placeholder - actual structure depends on Apple Music's current implementation
                     if isinstance(data, dict):
                         # Try common paths for credits data
                         if 'credits' in data:
                             credits.extend(self._extract_credits_from_json(data['credits']))
-                except (json.JSONDecodeError, AttributeError):
+                except orjson.JSONDecodeError:
                     continue
         except Exception as e:
             logger.debug(f"Strategy 1 (JSON parsing) failed: {e}")
 
+        if credits:
+            return self._dedup_and_validate(credits)
+
         # Strategy 2: DOM Parsing (fallback)
-        # Look for elements with class names related to credits
-        try:
-            # Common selectors for credits sections
-            credit_selectors = [
-                '[class*="credit"]',
-                '[class*="contributor"]',
-                '[data-testid*="credit"]',
-                '.credits',
-                '.contributors'
-            ]
-
-            for selector in credit_selectors:
-                elements = soup.select(selector)
-                for elem in elements:
-                    text = elem.get_text(strip=True)
-                    if text:
-                        parsed = self._parse_credit_text(text)
-                        if parsed:
-                            credits.extend(parsed)
-        except Exception as e:
-            logger.debug(f"Strategy 2 (DOM parsing) failed: {e}")
+        # Look for elements with class names related to credits. Every selector
+        # needs "credit" or "contributor" in the markup, so skip building the DOM
+        # for pages without either
+        html_lower = html_content.lower()
+        if 'credit' in html_lower or 'contributor' in html_lower:
+            try:
+                for text in self._credit_element_texts(html_content):
+                    parsed = self._parse_credit_text(text)
+                    if parsed:
+                        credits.extend(parsed)
+            except Exception as e:
+                logger.debug(f"Strategy 2 (DOM parsing) failed: {e}")
 
-        # Strategy 3: Regex-based text extraction (last resort)
-        if not credits:
+        # Strategy 3: Regex-based text extraction (last resort). Tags are stripped
+        # with regexes rather than a DOM walk, and only if a role keyword appears
+        # anywhere in the page, since the text can't contain one otherwise
+        if not credits and any(keyword in html_lower for keyword in self.ROLE_KEYWORDS):
             try:
-                text_content = soup.get_text()
-                credits = self._extract_credits_from_text(text_content)
+                credits = self._extract_credits_from_text(self._html_to_text(html_content))
             except Exception as e:
                 logger.debug(f"Strategy 3 (regex extraction) failed: {e}")
 
-        # Remove duplicates and validate
+        return self._dedup_and_validate(credits)
+
+    def _dedup_and_validate(self, credits: List[Dict]) -> List[Dict]:
+        """Drop malformed and duplicate (name, role) credits, keeping first occurrences."""
         unique_credits = []
         seen = set()
         for c in credits:
@@ -148,6 +466,20 @@ class CreditsScraper:
 
         return unique_credits
 
+    def _credit_element_texts(self, html_content: str) -> Iterator[str]:
+        """Stripped text of each element matching CREDIT_SELECTORS."""
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=_CREDIT_STRAINER)
+        for selector in self.CREDIT_SELECTORS:
+            for elem in soup.select(selector):
+                text = elem.get_text(strip=True)
+                if text:
+                    yield text
+
+    def _html_to_text(self, html_content: str) -> str:
+        """Page text without building a DOM: drop scripts, styles and comments, then tags."""
+        text = self.NON_TEXT_PATTERN.sub("", html_content)
+        return html.unescape(self.TAG_PATTERN.sub("", text))
+
     def _extract_credits_from_json(self, json_data) -> List[Dict]:
         """Extract credits from JSON structure."""
         credits = []
@@ -157,23 +489,19 @@ class CreditsScraper:
 
     def _parse_credit_text(self, text: str) -> List[Dict]:
         """Parse credit information from text content."""
+        text_lower = text.lower()
+        if not any(keyword in text_lower for keyword in self.ROLE_KEYWORDS):
+            return []
+
         credits = []
-        target_roles = [
-            "Immersive Mix Engineer", "Dolby Atmos Mixer", "Surround Mix Engineer",
-            "Mix Engineer", "Mastering Engineer", "Engineer", "Producer"
-        ]
-
-        for role in target_roles:
-            pattern = re.compile(f"{re.escape(role)}\\s*[:|-]?\\s*([A-Z][a-zA-Z0-9\\s\\.]+)", re.IGNORECASE)
-            matches = pattern.findall(text)
-            for name in matches:
-                name = name.strip()
-                if 2 < len(name) < 50:
-                    credits.append({
-                        "role": role,
-                        "name": name,
-                        "slug": name.lower().replace(" ", "-").replace(".", "")
-                    })
+        for match in self.ROLE_PATTERN.finditer(text):
+            name = match.group("name").strip()
+            if 2 < len(name) < 50:
+                credits.append({
+                    "role": self._ROLE_NAMES[match.group("role").lower()],
+                    "name": name,
+                    "slug": name.lower().translate(self._SLUG_TABLE)
+                })
         return credits
 
     def _extract_credits_from_text(self, text_content: str) -> List[Dict]:
@@ -0,0 +1,127 @@
+"""
+Redis-backed rate limiting shared across server instances.
+
+The in-memory limiters in backend.main only protect a single process; with
+several instances behind a load balancer each one keeps its own counters.
+When REDIS_URL is configured these helpers keep the counters in Redis instead:
+
+- General API limit: approximate sliding window built from two fixed-window
+  counters (current and previous window), ~16 bytes per key.
+- Public refresh cooldown: a single key per IP with an expiry equal to the cooldown.
+
+Every method returns None when Redis is unreachable so callers can fall back
+to the in-memory implementation.
+"""
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Atomic check-and-increment for the approximate sliding window.
+# KEYS[1] = current window counter, KEYS[2] = previous window counter
+# ARGV[1] = max requests, ARGV[2] = weight of previous window, ARGV[3] = counter TTL (ms)
+_SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """
+    Rate limiter storing its state in Redis.
+    """
+
+    KEY_PREFIX = "rl"
+
+    def __init__(self, redis_url: str, window: int, max_requests: int):
+        # Imported lazily so redis is only required when REDIS_URL is set
+        from redis.asyncio import Redis
+
+        self.window = window
+        self.max_requests = max_requests
+        self._redis = Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._sliding_window = self._redis.register_script(_SLIDING_WINDOW_LUA)
+
+    async def check_rate_limit(self, client_ip: str) -> Optional[bool]:
+        """
+        Check and record a request against the shared sliding window.
+
+        Returns:
+            True if allowed, False if the limit is exceeded, None if Redis failed.
+        """
+        now = time.time()
+        current_window = int(now // self.window)
+        previous_weight = 1 - (now % self.window) / self.window
+
+        try:
+            allowed = await self._sliding_window(
+                keys=[
+                    f"{self.KEY_PREFIX}:{client_ip}:{current_window}",
+                    f"{self.KEY_PREFIX}:{client_ip}:{current_window - 1}",
+                ],
+                args=[self.max_requests, previous_weight, self.window * 2 * 1000],
+            )
+        except Exception as e:
+            logger.warning(
+                f"Redis rate limit check failed, using in-memory fallback: {type(e).__name__}"
+            )
+            return None
+
+        return bool(allowed)
+
+    def _refresh_key(self, client_ip: str) -> str:
+        return f"{self.KEY_PREFIX}:refresh:{client_ip}"
+
+    async def refresh_seconds_remaining(self, client_ip: str, cooldown: int) -> Optional[int]:
+        """
+        Seconds until this IP may trigger a public refresh again (0 if allowed now).
+
+        A cooldown key that lost its expiry would block acquire_refresh forever,
+        so it gets a fresh cooldown instead.
+        """
+        key = self._refresh_key(client_ip)
+        try:
+            ttl = int(await self._redis.ttl(key))
+            if ttl == -1:
+                await self._redis.expire(key, cooldown)
+                return cooldown
+        except Exception as e:
+            logger.warning(
+                f"Redis refresh check failed, using in-memory fallback: {type(e).__name__}"
+            )
+            return None
+
+        # -2: no key, so the IP may refresh now
+        return max(ttl, 0)
+
+    async def acquire_refresh(self, client_ip: str, cooldown: int) -> Optional[bool]:
+        """
+        Atomically start a public refresh cooldown for this IP (SET NX EX).
+
+        Returns:
+            True if the cooldown was started, False if one is already running,
+            None if Redis failed.
+        """
+        try:
+            acquired = await self._redis.set(self._refresh_key(client_ip), 1, ex=cooldown, nx=True)
+        except Exception as e:
+            logger.warning(
+                f"Redis refresh acquire failed, using in-memory fallback: {type(e).__name__}"
+            )
+            return None
+
+        return bool(acquired)
+
+    async def release_refresh(self, client_ip: str) -> None:
+        """Clear the cooldown so the client can retry (e.g. after a failed refresh)."""
+        try:
+            await self._redis.delete(self._refresh_key(client_ip))
+        except Exception as e:
+            logger.warning(f"Redis refresh release failed: {type(e).__name__}")
@@ -9,14 +9,17 @@ def check_counts():
         return
 
     try:
-        conn = sqlite3.connect(db_path)
+        # Read-only: a check never writes (or creates a missing database file)
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM tracks")
-        track_count = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM tracks WHERE format = 'Dolby Atmos'")
-        atmos_count = cursor.fetchone()[0]
+        # One statement for both counts; the Atmos count is a range count on
+        # ix_tracks_format_release_date (leading column format), not a table scan
+        cursor.execute(
+            "SELECT (SELECT COUNT(*) FROM tracks),"
+            " (SELECT COUNT(*) FROM tracks WHERE format = 'Dolby Atmos')"
+        )
+        track_count, atmos_count = cursor.fetchone()
 
         print(f"Total Tracks: {track_count}")
         print(f"Dolby Atmos Tracks: {atmos_count}")
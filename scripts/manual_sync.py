@@ -25,23 +25,21 @@ def main():
     print("Starting manual synchronization...")
     print("This may take a minute or two depending on network speed.")
 
-    db = SessionLocal()
-    try:
-        # Run the sync
-        result = sync_spatial_audio_tracks(db, comprehensive=True)
-
-        print("\n" + "="*50)
-        print("SYNC COMPLETE")
-        print(f"Tracks Added:   {result['tracks_added']}")
-        print(f"Tracks Updated: {result['tracks_updated']}")
-        print("="*50 + "\n")
-
-    except Exception as e:
-        print(f"\nERROR: Sync failed: {e}")
-        logger.error("Sync failed", exc_info=True)
-        sys.exit(1)
-    finally:
-        db.close()
+    with SessionLocal() as db:
+        try:
+            # Upserts are batched and committed once per batch by the sync itself
+            result = sync_spatial_audio_tracks(db, comprehensive=True)
+
+            print("\n" + "="*50)
+            print("SYNC COMPLETE")
+            print(f"Tracks Added:   {result['tracks_added']}")
+            print(f"Tracks Updated: {result['tracks_updated']}")
+            print("="*50 + "\n")
+
+        except Exception as e:
+            print(f"\nERROR: Sync failed: {e}")
+            logger.error("Sync failed", exc_info=True)
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
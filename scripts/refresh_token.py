@@ -13,6 +13,9 @@ sys.path.append(str(project_root))
 
 from backend.utils.apple_music import get_apple_music_token
 
+# Token line in .env: group 1 is the key and separator, kept as-is on replace
+TOKEN_LINE_PATTERN = re.compile(r'(APPLE_MUSIC_DEVELOPER_TOKEN\s*=\s*)(.*)')
+
 
 def update_env_file(token):
     """Update the .env file with the new token."""
@@ -25,12 +28,9 @@ def update_env_file(token):
     with open(env_path, 'r') as f:
         content = f.read()
 
-    # Regex to find and replace the token line
-    pattern = r'(APPLE_MUSIC_DEVELOPER_TOKEN\s*=\s*)(.*)'
-
-    if re.search(pattern, content):
-        new_content = re.sub(pattern, f'\\g<1>{token}', content)
-    else:
+    # Replace the token line in one pass; the count tells whether it existed
+    new_content, replaced = TOKEN_LINE_PATTERN.subn(lambda m: m.group(1) + token, content)
+    if not replaced:
         # If not found, append it
         new_content = content + f"\nAPPLE_MUSIC_DEVELOPER_TOKEN={token}\n"
 
@@ -47,7 +47,7 @@ def main():
         from dotenv import load_dotenv
         load_dotenv(project_root / '.env')
 
-        token = get_apple_music_token()
+        token = get_apple_music_token(force_refresh=True)
         print(f"Token generated successfully (starts with: {token[:20]}...)")
 
         if update_env_file(token):
@@ -0,0 +1,61 @@
+import os
+from datetime import datetime
+
+import pytest
+
+# Set environment variables BEFORE importing app to ensure they are picked up
+os.environ["ENVIRONMENT"] = "testing"
+os.environ["DATABASE_URL"] = "sqlite:///./test_spatial_selecta.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend.database import Base, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import Track  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_database():
+    # Create tables once for the whole run
+    Base.metadata.create_all(bind=engine)
+    yield
+    # Cleanup
+    if os.path.exists("./test_spatial_selecta.db"):
+        os.remove("./test_spatial_selecta.db")
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Shared across tests; not entered as a context manager, so the startup
+    # event (init_db + start_scheduler) does not run under test
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_track():
+    """Build an unsaved Apple Music Atmos track; keyword arguments override the defaults."""
+    def make(title, **overrides):
+        fields = {
+            "artist": "Artist",
+            "album": "Album",
+            "format": "Dolby Atmos",
+            "platform": "Apple Music",
+            "release_date": datetime(2024, 1, 1),
+        }
+        fields.update(overrides)
+        return Track(title=title, **fields)
+
+    return make
+
+
+@pytest.fixture
+def query_counter():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", count)
+    yield statements
+    event.remove(engine, "after_cursor_execute", count)
@@ -1,39 +1,30 @@
-import os
+import asyncio
+import hashlib
+import time
+from collections import Counter, deque
+from datetime import datetime
 
-import pytest
+from backend import main
+from backend.database import Base, SessionLocal
+from backend.main import _stats_cache, _tracks_cache
+from backend.models import CommunityRating, Engineer, TrackCredit
+from backend.scheduler import refresh_engineer_mix_counts
+from backend.utils.redis_rate_limit import RedisRateLimiter
 
-# Set environment variables BEFORE importing app to ensure they are picked up
-os.environ["ENVIRONMENT"] = "testing"
-os.environ["DATABASE_URL"] = "sqlite:///./test_spatial_selecta.db"
 
-from fastapi.testclient import TestClient
-
-from backend.database import Base, engine
-from backend.main import app
-
-
-@pytest.fixture(scope="module", autouse=True)
-def setup_database():
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    yield
-    # Cleanup
-    if os.path.exists("./test_spatial_selecta.db"):
-        os.remove("./test_spatial_selecta.db")
-
-client = TestClient(app)
-
-def test_read_main():
+def test_read_main(client):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json()["name"] == "SpatialSelects.com API"
 
-def test_health_check():
+
+def test_health_check(client):
     response = client.get("/api/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
-def test_get_tracks_structure():
+
+def test_get_tracks_structure(client):
     # This might fail if DB is empty, but returns 200 list
     response = client.get("/api/tracks?limit=10")
     assert response.status_code == 200
@@ -46,7 +37,349 @@ def test_get_tracks_structure():
         assert "artist" in track
         assert "platform" in track
 
-def test_get_engineers():
+
+def test_get_engineers(client):
     response = client.get("/api/engineers")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_rate_missing_track(client):
+    response = client.post("/api/tracks/999999/rate", json={"score": 5})
+    assert response.status_code == 404
+
+
+def test_get_engineers_uses_mix_counts(client, make_track):
+    db = SessionLocal()
+    try:
+        track = make_track("Mix Count Track")
+        engineer = Engineer(name="Mix Count Engineer", slug="mix-count-engineer")
+        db.add_all([track, engineer])
+        db.flush()
+        db.add(TrackCredit(track_id=track.id, engineer_id=engineer.id, role="Mix Engineer"))
+        db.commit()
+        refresh_engineer_mix_counts(db)
+    finally:
+        db.close()
+
+    response = client.get("/api/engineers")
+    assert response.status_code == 200
+    names = {e["name"]: e["mix_count"] for e in response.json()}
+    assert names.get("Mix Count Engineer") == 1
+
+
+def test_rate_track_updates_average(client, make_track):
+    db = SessionLocal()
+    try:
+        track = make_track("Rated Track")
+        db.add(track)
+        db.commit()
+        track_id = track.id
+    finally:
+        db.close()
+
+    response = client.post(f"/api/tracks/{track_id}/rate", json={"score": 8})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["track_id"] == track_id
+    assert data["avg_immersiveness"] == 8.0
+    assert data["is_fake_atmos_ratio"] == 0.0
+
+    # A second vote from the same client replaces the first
+    response = client.post(f"/api/tracks/{track_id}/rate", json={"score": 4, "is_fake": True})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["avg_immersiveness"] == 4.0
+    assert data["is_fake_atmos_ratio"] == 1.0
+
+
+def test_rate_track_replaces_vote_stored_with_legacy_hash(client, make_track):
+    db = SessionLocal()
+    try:
+        track = make_track("Legacy Rated Track")
+        db.add(track)
+        db.flush()
+        # Hash format used by votes stored before this release
+        legacy_hash = hashlib.sha256(f"testclient{main.RATING_IP_SALT}".encode()).hexdigest()
+        db.add(CommunityRating(track_id=track.id, immersiveness_score=2, user_ip_hash=legacy_hash))
+        db.commit()
+        track_id = track.id
+    finally:
+        db.close()
+
+    response = client.post(f"/api/tracks/{track_id}/rate", json={"score": 9})
+    assert response.status_code == 200
+    assert response.json()["avg_immersiveness"] == 9.0
+
+
+def test_get_stats(client, make_track):
+    _stats_cache.clear()
+    before = client.get("/api/stats").json()
+
+    db = SessionLocal()
+    try:
+        db.add_all([
+            make_track("Stats Atmos Track", release_date=datetime.utcnow()),
+            make_track(
+                "Stats 360 Track",
+                format="360 Reality Audio",
+                release_date=datetime(2020, 1, 1),
+            ),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    # Served from cache until invalidated by a sync
+    assert client.get("/api/stats").json() == before
+    _stats_cache.clear()
+
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_tracks"] == before["total_tracks"] + 2
+    assert data["by_format"]["Dolby Atmos"] == before["by_format"]["Dolby Atmos"] + 1
+    assert data["new_tracks_last_30_days"] == before["new_tracks_last_30_days"] + 1
+
+
+def test_security_headers(client):
+    response = client.get("/api/health")
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert "server" not in response.headers
+
+
+def test_request_too_large(client):
+    response = client.post(
+        "/api/tracks/1/rate",
+        content=b"{}",
+        headers={"Content-Type": "application/json", "Content-Length": str(2 * 1024 * 1024)},
+    )
+    assert response.status_code == 413
+    assert response.text == "Request too large"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+def test_check_rate_limit_window():
+    ip = "198.51.100.7"
+    main.rate_limit_store.pop(ip, None)
+    for _ in range(main.RATE_LIMIT_MAX_REQUESTS):
+        assert main.check_rate_limit(ip)
+    assert not main.check_rate_limit(ip)
+    main.rate_limit_store.pop(ip, None)
+
+
+def test_rate_limited_endpoint_returns_429(client):
+    main.rate_limit_store["testclient"] = deque([time.monotonic()] * main.RATE_LIMIT_MAX_REQUESTS)
+    try:
+        response = client.get("/api/stats")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(main.RATE_LIMIT_WINDOW)
+        # Endpoints outside the rate-limited set are unaffected
+        assert client.get("/api/health").status_code == 200
+    finally:
+        main.rate_limit_store.pop("testclient", None)
+
+
+def test_verify_refresh_token(monkeypatch):
+    monkeypatch.setattr(main, "_REFRESH_TOKEN_BYTES", b"secret-token")
+    assert main.verify_refresh_token("Bearer secret-token")
+    assert not main.verify_refresh_token("Bearer wrong-token")
+    assert not main.verify_refresh_token("Bearer Bearer secret-token")
+    assert not main.verify_refresh_token(None)
+
+
+def test_rate_limit_store_eviction_keeps_recent_ips():
+    saved = dict(main.rate_limit_store)
+    main.rate_limit_store.clear()
+    try:
+        now = time.monotonic()
+        for i in range(main.RATE_LIMIT_MAX_TRACKED_IPS + 1):
+            main.rate_limit_store[f"ip-{i}"] = deque([now + i])
+        assert main.check_rate_limit("ip-new")
+        assert len(main.rate_limit_store) <= main.RATE_LIMIT_MAX_TRACKED_IPS // 2 + 1
+        assert f"ip-{main.RATE_LIMIT_MAX_TRACKED_IPS}" in main.rate_limit_store
+        assert "ip-0" not in main.rate_limit_store
+    finally:
+        main.rate_limit_store.clear()
+        main.rate_limit_store.update(saved)
+
+
+def test_get_tracks_invalid_platform(client):
+    response = client.get("/api/tracks?platform=Spotify")
+    assert response.status_code == 400
+    assert "Apple Music" in response.json()["detail"]
+
+
+def test_get_tracks_etag_revalidation(client):
+    response = client.get("/api/tracks")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    cached = client.get("/api/tracks", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    # Different parameters produce a different representation
+    other = client.get("/api/tracks?limit=5", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+
+def test_get_tracks_served_from_cache(client):
+    _tracks_cache.clear()
+    first = client.get("/api/tracks")
+    assert first.status_code == 200
+    assert (None, None, 100, None) in _tracks_cache
+
+    second = client.get("/api/tracks")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    if first.json():
+        assert "credits" in first.json()[0]
+
+
+def test_get_tracks_cursor_pagination(client, make_track):
+    db = SessionLocal()
+    try:
+        db.add_all([
+            make_track(
+                f"Paged Track {i}",
+                release_date=datetime(2023, 1, 1 + i % 2),
+                atmos_release_date=datetime(2024, 1, 1) if i % 3 else None,
+            )
+            for i in range(7)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    expected = [t["id"] for t in client.get("/api/tracks?limit=1000").json()]
+
+    paged = []
+    cursor = None
+    while True:
+        url = "/api/tracks?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        paged.extend(t["id"] for t in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert paged == expected
+
+    assert client.get("/api/tracks?cursor=not-a-cursor").status_code == 400
+
+
+def test_public_refresh_limit_cooldown():
+    main.public_refresh_store.pop("203.0.113.42", None)
+    assert main.check_public_refresh_limit("203.0.113.42") == (True, 0)
+
+    main.public_refresh_store["203.0.113.42"] = time.time()
+    allowed, remaining = main.check_public_refresh_limit("203.0.113.42")
+    assert not allowed
+    assert 0 < remaining <= main.PUBLIC_REFRESH_COOLDOWN
+    main.public_refresh_store.pop("203.0.113.42", None)
+
+
+def test_refresh_status_cache_invalidated_on_refresh():
+    ip = "203.0.113.43"
+    main.public_refresh_store.pop(ip, None)
+    main._refresh_status_cache.pop(ip, None)
+    try:
+        assert asyncio.run(main.get_public_refresh_status(ip)) == (True, 0)
+        assert asyncio.run(main.start_public_refresh(ip)) == (True, 0)
+        allowed, _ = asyncio.run(main.get_public_refresh_status(ip))
+        assert not allowed
+    finally:
+        main.public_refresh_store.pop(ip, None)
+        main._refresh_status_cache.pop(ip, None)
+
+
+def test_redis_refresh_key_without_expiry_gets_cooldown():
+    class FakeRedis:
+        def __init__(self):
+            self.ttls = {}
+
+        async def ttl(self, key):
+            return self.ttls.get(key, -2)
+
+        async def expire(self, key, seconds):
+            self.ttls[key] = seconds
+
+    limiter = RedisRateLimiter.__new__(RedisRateLimiter)
+    limiter._redis = FakeRedis()
+    assert asyncio.run(limiter.refresh_seconds_remaining("203.0.113.44", 3600)) == 0
+
+    key = limiter._refresh_key("203.0.113.44")
+    limiter._redis.ttls[key] = -1
+    assert asyncio.run(limiter.refresh_seconds_remaining("203.0.113.44", 3600)) == 3600
+    assert limiter._redis.ttls[key] == 3600
+
+
+def test_rating_trigger_sets_hall_of_shame(make_track):
+    db = SessionLocal()
+    try:
+        track = make_track("Fake Atmos Track")
+        db.add(track)
+        db.commit()
+
+        db.add_all([
+            CommunityRating(
+                track_id=track.id, immersiveness_score=2,
+                is_fake_atmos=i < 3, user_ip_hash=f"voter-{i}"
+            )
+            for i in range(6)
+        ])
+        db.commit()
+        db.refresh(track)
+
+        assert track.avg_immersiveness == 2.0
+        assert track.hall_of_shame is True
+    finally:
+        db.close()
+
+
+def test_single_mapper_per_table():
+    tables = Counter(mapper.local_table.name for mapper in Base.registry.mappers)
+    assert tables["tracks"] == 1
+    assert all(count == 1 for count in tables.values())
+
+
+def test_track_endpoints_query_count(client, query_counter, make_track):
+    db = SessionLocal()
+    try:
+        engineer = Engineer(name="Query Count Engineer", slug="query-count-engineer")
+        db.add(engineer)
+        tracks = [
+            make_track(f"Query Count {i}")
+            for i in range(3)
+        ]
+        db.add_all(tracks)
+        db.flush()
+        db.add_all(
+            TrackCredit(track_id=track.id, engineer_id=engineer.id, role="Mixing Engineer")
+            for track in tracks
+        )
+        db.commit()
+        track_id = tracks[0].id
+    finally:
+        db.close()
+
+    # ETag, tracks, credits, engineers: independent of the number of tracks
+    query_counter.clear()
+    response = client.get("/api/tracks?limit=37")
+    assert response.status_code == 200
+    credits = [c for t in response.json() for c in t["credits"]]
+    assert any(c["engineer_name"] == "Query Count Engineer" for c in credits)
+    assert len(query_counter) <= 4
+
+    query_counter.clear()
+    response = client.get(f"/api/tracks/{track_id}")
+    assert response.status_code == 200
+    assert response.json()["credits"][0]["engineer_name"] == "Query Count Engineer"
+    assert len(query_counter) <= 4
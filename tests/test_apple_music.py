@@ -0,0 +1,65 @@
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from backend.apple_music_client import AppleMusicClient
+from backend.utils import apple_music
+
+
+def test_apple_music_token_reused_across_processes(tmp_path, monkeypatch):
+    key_path = tmp_path / "AuthKey_TEST.p8"
+    key_path.write_bytes(ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    monkeypatch.setenv("APPLE_TEAM_ID", "TEAM")
+    monkeypatch.setenv("APPLE_KEY_ID", "KEY")
+    monkeypatch.setenv("APPLE_KEY_PATH", str(key_path))
+    monkeypatch.setattr(apple_music, "TOKEN_CACHE_PATH", tmp_path / "cache" / "apple_token.json")
+    monkeypatch.setattr(apple_music, "_cached_token", None)
+    apple_music._load_signing_key.cache_clear()
+
+    apple_music.get_apple_music_token()
+    assert (apple_music.TOKEN_CACHE_PATH.stat().st_mode & 0o777) == 0o600
+
+    # Re-signing reuses the parsed key
+    token = apple_music.get_apple_music_token(force_refresh=True)
+    assert apple_music._load_signing_key.cache_info().misses == 1
+
+    # A fresh process (empty in-memory cache) picks the token up from disk
+    monkeypatch.setattr(apple_music, "_cached_token", None)
+    monkeypatch.setattr(apple_music.jwt, "encode", None)
+    assert apple_music.get_apple_music_token() == token
+
+
+def test_playlist_scan_fetches_concurrently_in_playlist_order(monkeypatch):
+    monkeypatch.setenv("APPLE_MUSIC_DEVELOPER_TOKEN", "test-token")
+    apple_client = AppleMusicClient()
+    monkeypatch.setattr(AppleMusicClient, "NEW_MUSIC_PLAYLISTS", ["pl.slow", "pl.fast"])
+    monkeypatch.setattr(AppleMusicClient, "CHART_PLAYLISTS", [])
+    running, peak = set(), []
+
+    def get_playlist_tracks(playlist_id, storefront):
+        running.add(playlist_id)
+        peak.append(len(running))
+        time.sleep(0.05 if playlist_id == "pl.slow" else 0)
+        running.discard(playlist_id)
+        return [{"id": "shared", "from": playlist_id}]
+
+    monkeypatch.setattr(apple_client, "get_playlist_tracks", get_playlist_tracks)
+    monkeypatch.setattr(
+        apple_client, "check_spatial_audio_support", lambda track: {"has_spatial_audio": True}
+    )
+    monkeypatch.setattr(apple_client, "_extract_track_info", lambda track, info: dict(track))
+
+    tracks = apple_client.discover_from_new_music_playlists()
+    assert tracks == [{"id": "shared", "from": "pl.slow"}]
+    assert max(peak) == 2
+
+
+def test_connection_check_rejects_malformed_token(monkeypatch):
+    monkeypatch.setenv("APPLE_MUSIC_DEVELOPER_TOKEN", "not-a-jwt")
+    apple_client = AppleMusicClient()
+    monkeypatch.setattr(apple_client, "_make_request", None)
+
+    assert apple_client.test_connection() is False
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import httpx
+import orjson
+from bs4 import BeautifulSoup
+
+from backend.utils import credits_scraper
+from backend.utils.credits_scraper import CreditsScraper
+
+
+def test_parse_credit_text_single_pass_roles():
+    credits = CreditsScraper()._parse_credit_text(
+        "Immersive Mix Engineer: John Smith Mastering Engineer - Bob Ludwig\nProducer Max Martin"
+    )
+    assert [(c["role"], c["name"]) for c in credits] == [
+        ("Immersive Mix Engineer", "John Smith"),
+        ("Mastering Engineer", "Bob Ludwig"),
+        ("Producer", "Max Martin"),
+    ]
+    assert credits[0]["slug"] == "john-smith"
+
+
+def test_parse_credits_skips_dom_without_credit_markup(monkeypatch):
+    def no_dom(*args, **kwargs):
+        raise AssertionError("DOM should not be built")
+
+    monkeypatch.setattr(credits_scraper, "BeautifulSoup", no_dom)
+    scraper = credits_scraper.CreditsScraper()
+
+    credits = scraper._parse_credits(
+        "<html><head><script>var role = 'Producer: Nobody';</script></head>"
+        "<body><p>Producer: Max Martin</p></body></html>"
+    )
+    assert [(c["role"], c["name"]) for c in credits] == [("Producer", "Max Martin")]
+
+
+def test_role_keywords_cover_target_roles():
+    for role in CreditsScraper.TARGET_ROLES:
+        assert any(keyword in role.lower() for keyword in CreditsScraper.ROLE_KEYWORDS)
+    assert CreditsScraper()._parse_credit_text("Liner notes: thanks to everyone") == []
+
+
+def test_async_rate_limit_spaces_concurrent_requests(monkeypatch):
+    monkeypatch.setattr(CreditsScraper, "MIN_DELAY", 0.05)
+    monkeypatch.setattr(CreditsScraper, "MAX_DELAY", 0.05)
+    scraper = CreditsScraper()
+    starts = []
+
+    async def request():
+        await scraper._wait_for_rate_limit_async()
+        starts.append(time.time())
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(3)))
+
+    asyncio.run(main())
+    starts.sort()
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:], strict=False))
+
+
+def test_fetch_credits_revalidates_with_etag(monkeypatch, tmp_path):
+    # Every stored entry is stale, so each call goes to the network
+    monkeypatch.setattr(credits_scraper, "CREDITS_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(credits_scraper, "CREDITS_CACHE_TTL", 0)
+
+    url = "https://music.apple.com/us/song/etag-test/1"
+    page = "<html><body><p>Producer: Max Martin</p></body></html>"
+    sent_headers = []
+
+    class FakeClient:
+        def get(self, track_url, headers=None):
+            sent_headers.append(headers)
+            request = httpx.Request("GET", track_url)
+            if headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, request=request)
+            return httpx.Response(200, headers={"ETag": '"v1"'}, text=page, request=request)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(credits_scraper.CreditsScraper, "_wait_for_rate_limit", lambda self: None)
+    scraper = credits_scraper.CreditsScraper()
+    scraper._client = FakeClient()
+
+    first = scraper.fetch_credits(url)
+    assert [(c["role"], c["name"]) for c in first] == [("Producer", "Max Martin")]
+    assert "If-None-Match" not in sent_headers[0]
+    stored = orjson.loads(credits_scraper._stored_credits_path(url).read_bytes())
+    assert stored["etag"] == '"v1"'
+
+    # The validator comes from the disk entry, so a new scraper (or process) sends it too
+    restarted = credits_scraper.CreditsScraper()
+    restarted._client = FakeClient()
+    monkeypatch.setattr(restarted, "_parse_credits", None)
+    assert restarted.fetch_credits(url) == first
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+
+
+def test_parse_credits_reads_credit_elements():
+    scraper = credits_scraper.CreditsScraper()
+
+    credits = scraper._parse_credits(
+        '<html><body><div class="song-credits"><span>Mix Engineer: Serban Ghenea</span></div>'
+        "</body></html>"
+    )
+    assert [(c["role"], c["name"]) for c in credits] == [("Mix Engineer", "Serban Ghenea")]
+
+
+def test_parse_credits_skips_dom_when_json_has_credits(monkeypatch):
+    def no_dom(*args, **kwargs):
+        raise AssertionError("DOM should not be built")
+
+    monkeypatch.setattr(credits_scraper, "BeautifulSoup", no_dom)
+    scraper = credits_scraper.CreditsScraper()
+    monkeypatch.setattr(scraper, "_extract_credits_from_json", lambda data: list(data))
+
+    credits = scraper._parse_credits(
+        '<html><head><script type="application/json">'
+        '{"credits": [{"name": "Max Martin", "role": "Producer"},'
+        ' {"name": "Max Martin", "role": "Producer"}]}'
+        '</script></head><body><div class="credits">Mix Engineer: Serban Ghenea</div></body></html>'
+    )
+    assert credits == [{"name": "Max Martin", "role": "Producer"}]
+
+
+def test_fetch_credits_reuses_stored_credits(monkeypatch, tmp_path):
+    monkeypatch.setattr(credits_scraper, "CREDITS_CACHE_DIR", tmp_path)
+    pages = {
+        "https://music.apple.com/us/song/stored/1": (
+            "<html><body><p>Producer: Max Martin</p></body></html>"
+        ),
+    }
+    requested = []
+
+    class FakeClient:
+        def get(self, track_url, headers=None):
+            requested.append(track_url)
+            request = httpx.Request("GET", track_url)
+            if track_url not in pages:
+                return httpx.Response(404, request=request)
+            return httpx.Response(200, text=pages[track_url], request=request)
+
+    monkeypatch.setattr(credits_scraper.CreditsScraper, "_wait_for_rate_limit", lambda self: None)
+    found, missing = "https://music.apple.com/us/song/stored/1", "https://music.apple.com/us/song/gone/2"
+
+    for _ in range(2):
+        # A fresh scraper each time, as each scheduler run creates its own
+        scraper = credits_scraper.CreditsScraper()
+        scraper._client = FakeClient()
+        assert [c["name"] for c in scraper.fetch_credits(found)] == ["Max Martin"]
+        assert scraper.fetch_credits(missing) == []
+
+    assert requested == [found, missing]
+
+    monkeypatch.setattr(credits_scraper, "MISSING_PAGE_CACHE_TTL", 0)
+    scraper.fetch_credits(missing)
+    assert requested == [found, missing, missing]
+
+
+def test_credit_strainer_keeps_only_credit_elements():
+    soup = BeautifulSoup(
+        '<html><body><nav><a href="/">Producer: Not This</a></nav>'
+        '<section data-testid="track-credits"><p class="Credits">Producer: Max Martin</p></section>'
+        '<ul class="contributors"><li>Engineer: Sam Holland</li></ul></body></html>',
+        credits_scraper.HTML_PARSER,
+        parse_only=credits_scraper._CREDIT_STRAINER,
+    )
+    assert soup.find("nav") is None
+    assert [elem.get_text(strip=True) for elem in soup.find_all(["section", "ul"])] == [
+        "Producer: Max Martin", "Engineer: Sam Holland"
+    ]
+
+
+def test_parse_credits_skips_text_fallback_without_role_keywords(monkeypatch):
+    scraper = credits_scraper.CreditsScraper()
+    monkeypatch.setattr(scraper, "_html_to_text", None)
+
+    assert scraper._parse_credits("<html><body><p>Artist: Someone</p></body></html>") == []
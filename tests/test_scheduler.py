@@ -0,0 +1,349 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import requests
+
+from backend import scheduler
+from backend.database import SessionLocal
+from backend.models import Engineer, RegionAvailability, Track, TrackCredit
+from backend.scheduler import _save_track_credits, import_existing_data_json
+from backend.utils import credits_scraper
+from backend.utils.credits_scraper import CreditsScraper
+
+
+def test_sync_upserts_discovered_tracks(monkeypatch):
+    def discovered_track(title):
+        return {
+            "title": title, "artist": "Sync Artist", "album": "Album",
+            "format": "Dolby Atmos", "platform": "Apple Music",
+            "release_date": datetime(2024, 5, 1), "apple_music_id": "sync-1",
+            "metadata": {"genres": ["Pop"], "isrc": "USABC2400001"},
+            "region_availability": [
+                {"storefront": "us", "is_available": True, "format": "Dolby Atmos"},
+            ],
+        }
+
+    discovered = [discovered_track("Sync Track")]
+
+    class FakeAppleMusicClient:
+        def iter_spatial_audio_track_batches(self, comprehensive=True):
+            yield discovered
+
+    monkeypatch.setattr(scheduler, "AppleMusicClient", FakeAppleMusicClient)
+
+    db = SessionLocal()
+    try:
+        assert scheduler.sync_spatial_audio_tracks(db) == {"tracks_added": 1, "tracks_updated": 0}
+
+        discovered[:] = [discovered_track("Sync Track (Remastered)")]
+        assert scheduler.sync_spatial_audio_tracks(db) == {"tracks_added": 0, "tracks_updated": 1}
+
+        track = db.query(Track).filter(Track.apple_music_id == "sync-1").one()
+        assert track.title == "Sync Track (Remastered)"
+        assert track.extra_metadata == {"genres": ["Pop"], "isrc": "USABC2400001"}
+        regions = db.query(RegionAvailability).filter(RegionAvailability.track_id == track.id)
+        assert regions.count() == 1
+    finally:
+        db.close()
+
+
+def test_import_existing_data_json_skips_existing(tmp_path):
+    entry = {
+        "title": "Imported Track", "artist": "Import Artist", "album": "Album",
+        "format": "Dolby Atmos", "platform": "Apple Music", "releaseDate": "2024-02-01",
+    }
+    data_json = tmp_path / "data.json"
+    data_json.write_text(json.dumps([entry, entry]))
+
+    db = SessionLocal()
+    try:
+        import_existing_data_json(db, str(data_json))
+        import_existing_data_json(db, str(data_json))
+        assert db.query(Track).filter(Track.title == "Imported Track").count() == 1
+    finally:
+        db.close()
+
+
+def test_save_track_credits_batches_engineers(make_track):
+    db = SessionLocal()
+    try:
+        tracks = [
+            make_track(f"Credits Batch {i}")
+            for i in range(2)
+        ]
+        existing = Engineer(name="Credits Batch Existing", slug="credits-batch-existing")
+        db.add_all([*tracks, existing])
+        db.commit()
+
+        credits = [
+            {
+                "name": "Credits Batch Existing",
+                "slug": "credits-batch-existing",
+                "role": "Mixing Engineer",
+            },
+            {
+                "name": "Credits Batch New",
+                "slug": "credits-batch-new",
+                "role": "Mastering Engineer",
+            },
+        ]
+        added = _save_track_credits(
+            db, [(tracks[0].id, credits), (tracks[1].id, credits + credits[:1])]
+        )
+        db.commit()
+        assert added == 4
+
+        # Already stored credits are skipped on a second pass
+        assert _save_track_credits(db, [(tracks[0].id, credits)]) == 0
+
+        new_engineers = db.query(Engineer).filter(Engineer.name == "Credits Batch New").all()
+        assert len(new_engineers) == 1
+        track_ids = [t.id for t in tracks]
+        stored = db.query(TrackCredit).filter(TrackCredit.track_id.in_(track_ids)).all()
+        assert {c.engineer_id for c in stored} == {existing.id, new_engineers[0].id}
+    finally:
+        db.close()
+
+
+def test_sync_query_count_independent_of_batch_size(monkeypatch, query_counter):
+    discovered = [
+        {
+            "title": f"Bulk Sync {i}", "artist": "Sync Artist", "album": "Album",
+            "format": "Dolby Atmos", "platform": "Apple Music",
+            "release_date": datetime(2024, 5, 1), "apple_music_id": f"bulk-sync-{i}",
+            "region_availability": [
+                {"storefront": "us", "is_available": True, "format": "Dolby Atmos"},
+            ],
+        }
+        for i in range(50)
+    ]
+
+    class FakeAppleMusicClient:
+        def iter_spatial_audio_track_batches(self, comprehensive=True):
+            yield discovered
+
+    monkeypatch.setattr(scheduler, "AppleMusicClient", FakeAppleMusicClient)
+
+    db = SessionLocal()
+    try:
+        # Existence lookup, upsert, region lookup, region insert
+        query_counter.clear()
+        assert scheduler.sync_spatial_audio_tracks(db) == {"tracks_added": 50, "tracks_updated": 0}
+        assert len(query_counter) <= 4
+
+        # Unchanged rescan: nothing is rewritten
+        query_counter.clear()
+        assert scheduler.sync_spatial_audio_tracks(db) == {"tracks_added": 0, "tracks_updated": 0}
+        assert len(query_counter) <= 3
+        statements = [s.lstrip().upper() for s in query_counter]
+        assert not any(s.startswith(("DELETE", "INSERT INTO REGION")) for s in statements)
+
+        # Only the changed track is updated
+        discovered[0] = {**discovered[0], "album": "Album (Deluxe)"}
+        assert scheduler.sync_spatial_audio_tracks(db) == {"tracks_added": 0, "tracks_updated": 1}
+
+        # Region changes are applied row by row
+        discovered[1] = {**discovered[1], "region_availability": [
+            {"storefront": "gb", "is_available": True, "format": "Dolby Atmos"},
+        ]}
+        scheduler.sync_spatial_audio_tracks(db)
+        track = db.query(Track).filter(Track.apple_music_id == "bulk-sync-1").one()
+        storefronts = db.query(RegionAvailability.storefront).filter(
+            RegionAvailability.track_id == track.id
+        ).all()
+        assert storefronts == [("gb",)]
+    finally:
+        db.close()
+
+
+def test_credits_fetch_marks_scraped_tracks(monkeypatch, make_track):
+    scraped = []
+
+    class FakeCreditsScraper(CreditsScraper):
+        async def fetch_credits_async(self, url):
+            scraped.append(url)
+            if url.endswith("with-credits"):
+                return [{
+                    "name": "Fetch Job Engineer",
+                    "slug": "fetch-job-engineer",
+                    "role": "Mixing Engineer",
+                }]
+            return []
+
+    monkeypatch.setattr(scheduler, "CreditsScraper", FakeCreditsScraper)
+    refreshes = []
+    monkeypatch.setattr(scheduler, "refresh_engineer_mix_counts", refreshes.append)
+
+    db = SessionLocal()
+    try:
+        tracks = [
+            make_track(
+                f"Credits Fetch {suffix}",
+                music_link=f"https://music.apple.com/us/song/{suffix}",
+                updated_at=datetime(2024, 1, 2),
+            )
+            for suffix in ("with-credits", "without-credits")
+        ]
+        db.add_all(tracks)
+        db.commit()
+        track_ids = [t.id for t in tracks]
+    finally:
+        db.close()
+
+    asyncio.run(scheduler.scheduled_credits_fetch())
+    assert len(scraped) == 2
+    assert len(refreshes) == 1
+
+    db = SessionLocal()
+    try:
+        stored = db.query(Track).filter(Track.id.in_(track_ids)).all()
+        assert all(t.credits_fetched_at is not None for t in stored)
+        assert all(t.updated_at == datetime(2024, 1, 2) for t in stored)
+        assert db.query(TrackCredit).filter(TrackCredit.track_id.in_(track_ids)).count() == 1
+    finally:
+        db.close()
+
+    # Neither track is picked up again, including the one without credits
+    asyncio.run(scheduler.scheduled_credits_fetch())
+    assert len(scraped) == 2
+
+
+def test_credits_fetch_retries_failed_scrapes(monkeypatch, tmp_path, make_track):
+    url = "https://music.apple.com/us/song/connect-error"
+    requested = []
+
+    async def connect_error(self, track_url, **kwargs):
+        requested.append(track_url)
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", connect_error)
+    monkeypatch.setattr(credits_scraper, "CREDITS_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(credits_scraper.CreditsScraper, "MIN_DELAY", 0)
+
+    db = SessionLocal()
+    try:
+        # Only this track is waiting for credits
+        db.query(Track).filter(Track.credits_fetched_at.is_(None)).update(
+            {Track.credits_fetched_at: datetime.now()}
+        )
+        track = make_track("Credits Fetch Failure", music_link=url)
+        db.add(track)
+        db.commit()
+        track_id = track.id
+    finally:
+        db.close()
+
+    refreshes = []
+    monkeypatch.setattr(scheduler, "refresh_engineer_mix_counts", refreshes.append)
+
+    for attempt in (1, 2):
+        asyncio.run(scheduler.scheduled_credits_fetch())
+        assert requested.count(url) == attempt
+        # Nothing was added, so the mix counts aren't rebuilt
+        assert refreshes == []
+
+        db = SessionLocal()
+        try:
+            assert db.get(Track, track_id).credits_fetched_at is None
+        finally:
+            db.close()
+
+
+def test_silent_upgrade_check_upgrades_atmos_tracks(monkeypatch, make_track):
+    lookups = []
+
+    class FakeAppleMusicClient:
+        def get_catalog_tracks(self, storefront="us", ids=None):
+            lookups.append(ids)
+            return [{"id": track_id} for track_id in ids]
+
+        def check_spatial_audio_support(self, track_data):
+            return {"has_dolby_atmos": track_data["id"] == "upgrade-yes"}
+
+    monkeypatch.setattr(scheduler, "AppleMusicClient", FakeAppleMusicClient)
+
+    db = SessionLocal()
+    try:
+        db.add_all([
+            make_track(
+                f"Upgrade {suffix}",
+                format="Stereo",
+                release_date=datetime(2020, 1, 1),
+                apple_music_id=f"upgrade-{suffix}",
+            )
+            for suffix in ("yes", "no")
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    asyncio.run(scheduler.scheduled_silent_upgrade_check())
+    # Both candidates go out in one catalog request
+    assert any({"upgrade-yes", "upgrade-no"} <= set(ids) for ids in lookups)
+
+    db = SessionLocal()
+    try:
+        formats = dict(db.query(Track.apple_music_id, Track.format).filter(
+            Track.apple_music_id.in_(["upgrade-yes", "upgrade-no"])
+        ).all())
+        assert formats == {"upgrade-yes": "Dolby Atmos", "upgrade-no": "Stereo"}
+        checked = db.query(Track).filter(Track.apple_music_id == "upgrade-no").one()
+        assert checked.last_atmos_check_at is not None
+    finally:
+        db.close()
+
+    # Back catalog that was just checked isn't looked up again next week
+    lookups.clear()
+    asyncio.run(scheduler.scheduled_silent_upgrade_check())
+    assert not any("upgrade-no" in ids for ids in lookups)
+
+
+def test_silent_upgrade_check_keeps_failed_lookups_due(monkeypatch, make_track):
+    db = SessionLocal()
+    try:
+        db.add_all([
+            make_track(
+                f"Lookup {suffix}",
+                format="Stereo",
+                release_date=datetime(2020, 1, 1),
+                apple_music_id=f"lookup-{suffix}",
+            )
+            for suffix in ("returned", "missing")
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    def last_checks():
+        db = SessionLocal()
+        try:
+            return dict(db.query(Track.apple_music_id, Track.last_atmos_check_at).filter(
+                Track.apple_music_id.in_(["lookup-returned", "lookup-missing"])
+            ).all())
+        finally:
+            db.close()
+
+    # API outage: _make_request swallows the timeout, the batch stays unchecked
+    def timeout(*args, **kwargs):
+        raise requests.exceptions.Timeout()
+
+    monkeypatch.setenv("APPLE_MUSIC_DEVELOPER_TOKEN", "test-token")
+    monkeypatch.setattr(requests.Session, "get", timeout)
+    asyncio.run(scheduler.scheduled_silent_upgrade_check())
+    assert last_checks() == {"lookup-returned": None, "lookup-missing": None}
+
+    # A successful lookup marks every requested ID checked, including ones it left out
+    class PartialAppleMusicClient:
+        def get_catalog_tracks(self, storefront="us", ids=None):
+            return [{"id": track_id} for track_id in ids if track_id != "lookup-missing"]
+
+        def check_spatial_audio_support(self, track_data):
+            return {"has_dolby_atmos": False}
+
+    monkeypatch.setattr(scheduler, "AppleMusicClient", PartialAppleMusicClient)
+    asyncio.run(scheduler.scheduled_silent_upgrade_check())
+    checks = last_checks()
+    assert checks["lookup-returned"] is not None
+    assert checks["lookup-missing"] is not None
@@ -1,9 +1,25 @@
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
 
 from backend.database import engine, init_db
 
+# WAL persists in the database file; the other two apply per connection
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+"""
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    dbapi_connection.executescript(SQLITE_PRAGMAS)
+
 
 def verify_schema():
+    if engine.dialect.name == "sqlite":
+        # Every connection this script opens (init_db DDL, inspector reads)
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+        engine.dispose()
+
     print("Initializing database...")
     init_db()
 